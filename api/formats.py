@@ -0,0 +1,262 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, Request, Response
+from config import Config
+from models.todo import Todo
+
+# Необязательные зависимости: MessagePack и сжатие brotli
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# Порядок полей в колоночном формате
+TODO_FIELDS = ("id", "title", "description", "completed", "created_at", "updated_at")
+
+
+class CompressedBodyCache:
+    """LRU-кэш сжатых тел ответов по хэшу исходного тела"""
+
+    def __init__(self, max_entries: int):
+        """
+        Инициализация кэша
+
+        Args:
+            max_entries (int): Максимальное количество записей
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        """
+        Получение сжатого тела из кэша или сжатие
+
+        Args:
+            body (bytes): Исходное тело ответа
+            encoding (str): Кодировка сжатия (gzip или br)
+
+        Returns:
+            bytes: Сжатое тело ответа
+        """
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compressed = compress(body, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+    def stats(self) -> dict:
+        """
+        Получение счётчиков кэша
+
+        Returns:
+            dict: Словарь со счётчиками
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+compressed_cache = CompressedBodyCache(Config.COMPRESSION_CACHE_SIZE)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Сжатие тела ответа
+
+    Args:
+        body (bytes): Исходное тело ответа
+        encoding (str): Кодировка сжатия (gzip или br)
+
+    Returns:
+        bytes: Сжатое тело ответа
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=Config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=Config.GZIP_LEVEL)
+
+
+def parse_quality_values(header: str) -> Dict[str, float]:
+    """
+    Разбор заголовка со списком значений и весами q (Accept, Accept-Encoding)
+
+    Args:
+        header (str): Значение заголовка
+
+    Returns:
+        Dict[str, float]: Значение (в нижнем регистре) -> вес от 0 до 1;
+        значения с некорректным весом считаются неприемлемыми
+    """
+    qualities = {}
+    for part in header.lower().split(","):
+        name, *params = (item.strip() for item in part.split(";"))
+        if not name:
+            continue
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        qualities[name] = quality
+    return qualities
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Выбор кодировки сжатия по заголовку Accept-Encoding
+
+    Учитываются веса q и значение *; при равных весах предпочитается br.
+
+    Args:
+        accept_encoding (str): Значение заголовка Accept-Encoding
+
+    Returns:
+        Optional[str]: br, gzip или None
+    """
+    qualities = parse_quality_values(accept_encoding)
+    default = qualities.get("*", 0.0)
+    candidates = ("br", "gzip") if brotli is not None else ("gzip",)
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = qualities.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def negotiate_media_type(request: Request, requested: Optional[str]) -> str:
+    """
+    Выбор формата ответа по параметру format или заголовку Accept
+
+    Args:
+        request (Request): HTTP-запрос
+        requested (Optional[str]): Явно запрошенный формат (json или msgpack)
+
+    Returns:
+        str: Тип содержимого ответа
+
+    Raises:
+        HTTPException: Если MessagePack запрошен, но не установлен
+    """
+    if requested is None:
+        requested = "msgpack" if _prefers_msgpack(request) else "json"
+
+    if requested == "msgpack":
+        if msgpack is None:
+            raise HTTPException(
+                status_code=406, detail="Формат MessagePack не поддерживается"
+            )
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def _prefers_msgpack(request: Request) -> bool:
+    """
+    Запрошен ли MessagePack в заголовке Accept
+
+    MessagePack выбирается, только если он указан явно с ненулевым весом
+    не меньше веса JSON (шаблоны */* и application/* относятся к JSON).
+    """
+    qualities = parse_quality_values(request.headers.get("accept", ""))
+    msgpack_quality = max(qualities.get(media, 0.0) for media in MSGPACK_MEDIA_TYPES)
+    json_quality = qualities.get(
+        JSON_MEDIA_TYPE,
+        qualities.get("application/*", qualities.get("*/*", 0.0)),
+    )
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
+
+
+def todos_payload(
+    todos: List[Todo], columnar: bool = False, epoch_timestamps: bool = False
+) -> dict:
+    """
+    Формирование тела ответа со списком задач
+
+    Args:
+        todos (List[Todo]): Список задач
+        columnar (bool): Колоночный формат (массив значений на каждое поле)
+        epoch_timestamps (bool): Дата и время в секундах Unix
+
+    Returns:
+        dict: Тело ответа
+    """
+    rows = [todo.to_dict(epoch_timestamps) for todo in todos]
+    if columnar:
+        data = {field: [row[field] for row in rows] for field in TODO_FIELDS}
+    else:
+        data = rows
+    return {"status": "success", "data": data, "count": len(rows)}
+
+
+def encode_body(payload: dict, media_type: str) -> bytes:
+    """
+    Сериализация тела ответа
+
+    Args:
+        payload (dict): Тело ответа
+        media_type (str): Тип содержимого
+
+    Returns:
+        bytes: Сериализованное тело
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(payload, use_bin_type=True)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+def render(request: Request, payload: dict, media_type: str) -> Response:
+    """
+    Формирование ответа со сжатием, если клиент его поддерживает
+
+    Тела размером не меньше Config.COMPRESSION_MIN_SIZE сжимаются; сжатые
+    тела кэшируются, поэтому повторные одинаковые ответы не сжимаются заново.
+
+    Args:
+        request (Request): HTTP-запрос
+        payload (dict): Тело ответа
+        media_type (str): Тип содержимого
+
+    Returns:
+        Response: HTTP-ответ
+    """
+    body = encode_body(payload, media_type)
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= Config.COMPRESSION_MIN_SIZE:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            body = compressed_cache.get_or_compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
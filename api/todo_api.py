@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from database.db import get_db, init_database
+from database.db import LazySession, request_session
 from services.todo_service import TodoService
+from api.formats import negotiate_media_type, render, todos_payload
+from services.idempotency_service import (
+    IdempotencyService,
+    IdempotencyKeyInProgress,
+    IdempotencyKeyMismatch,
+    request_fingerprint,
+)
 from models.todo import Todo
 
 # Создание роутера
@@ -13,52 +20,120 @@ router = APIRouter(
 )
 
 
-def get_todo_service(db: Session = Depends(get_db)) -> TodoService:
+# Сервисы и репозитории переиспользуются между запросами: сессия базы
+# данных берётся из области текущего запроса только при первом запросе к БД
+todo_service = TodoService()
+idempotency_service = IdempotencyService()
+
+
+async def get_todo_service(
+    session: LazySession = Depends(request_session),
+) -> TodoService:
     """
     Получение экземпляра сервиса задач
 
     Args:
-        db (Session): Сессия базы данных
+        session (LazySession): Ленивая сессия базы данных текущего запроса
 
     Returns:
         TodoService: Экземпляр сервиса задач
     """
-    return TodoService(db)
+    return todo_service
+
+
+async def get_idempotency_service(
+    session: LazySession = Depends(request_session),
+) -> IdempotencyService:
+    """
+    Получение экземпляра сервиса ключей идемпотентности
+
+    Args:
+        session (LazySession): Ленивая сессия базы данных текущего запроса
+
+    Returns:
+        IdempotencyService: Экземпляр сервиса ключей идемпотентности
+    """
+    return idempotency_service
 
 
 @router.get("/", response_model=dict)
-async def get_todos(
+def get_todos(
+    request: Request,
     completed: Optional[bool] = Query(None, description="Фильтр по статусу выполнения"),
     limit: int = Query(
         100, ge=1, le=1000, description="Максимальное количество результатов"
     ),
     offset: int = Query(0, ge=0, description="Смещение для пагинации"),
+    include_archived: bool = Query(False, description="Включать архивные задачи"),
+    response_format: Optional[str] = Query(
+        None,
+        alias="format",
+        pattern="^(json|msgpack)$",
+        description="Формат ответа (по умолчанию по заголовку Accept)",
+    ),
+    layout: str = Query(
+        "rows",
+        pattern="^(rows|columnar)$",
+        description="columnar - массив значений на каждое поле",
+    ),
+    timestamps: str = Query(
+        "iso",
+        pattern="^(iso|epoch)$",
+        description="epoch - дата и время в секундах Unix",
+    ),
     service: TodoService = Depends(get_todo_service),
 ):
     """
     Получение списка всех задач
 
     Args:
+        request (Request): HTTP-запрос
         completed (Optional[bool]): Фильтр по статусу выполнения
         limit (int): Максимальное количество результатов
         offset (int): Смещение для пагинации
+        include_archived (bool): Включать ли архивные задачи
+        response_format (Optional[str]): Формат ответа (json или msgpack)
+        layout (str): Построчный (rows) или колоночный (columnar) формат
+        timestamps (str): Формат даты и времени (iso или epoch)
         service (TodoService): Сервис задач
 
     Returns:
-        dict: Словарь с данными задач
+        Response: Ответ с данными задач (JSON или MessagePack, возможно сжатый)
+    """
+    media_type = negotiate_media_type(request, response_format)
+    todos = service.get_all_todos(
+        completed=completed,
+        skip=offset,
+        limit=limit,
+        include_archived=include_archived,
+    )
+    payload = todos_payload(
+        todos,
+        columnar=layout == "columnar",
+        epoch_timestamps=timestamps == "epoch",
+    )
+    return render(request, payload, media_type)
+
+
+# Регистрируется до /{todo_id}, иначе путь /stats разбирается как ID задачи
+@router.get("/stats", response_model=dict)
+def get_stats(service: TodoService = Depends(get_todo_service)):
     """
-    todos = service.get_all_todos(completed=completed, skip=offset, limit=limit)
-    count = len(todos)
+    Получение статистики по задачам
 
-    return {
-        "status": "success",
-        "data": [todo.to_dict() for todo in todos],
-        "count": count,
-    }
+    Args:
+        service (TodoService): Сервис задач
+
+    Returns:
+        dict: Словарь со статистикой
+    """
+    stats = service.get_stats()
+
+    return {"status": "success", "data": stats}
 
 
 @router.get("/{todo_id}", response_model=dict)
-async def get_todo(todo_id: int, service: TodoService = Depends(get_todo_service)):
+def get_todo(todo_id: int, service: TodoService = Depends(get_todo_service)):
     """
     Получение задачи по ID
 
@@ -80,15 +155,64 @@ async def get_todo(todo_id: int, service: TodoService = Depends(get_todo_service
 
 
 @router.post("/", response_model=dict, status_code=201)
-async def create_todo(
-    todo_data: dict, service: TodoService = Depends(get_todo_service)
+def create_todo(
+    todo_data: dict,
+    idempotency_key: Optional[str] = Header(
+        None, alias="Idempotency-Key", max_length=255
+    ),
+    service: TodoService = Depends(get_todo_service),
+    idempotency: IdempotencyService = Depends(get_idempotency_service),
 ):
     """
     Создание новой задачи
 
+    С заголовком Idempotency-Key повтор запроса возвращает сохранённый ответ
+    (с заголовком Idempotent-Replayed) вместо создания дубликата.
+
     Args:
         todo_data (dict): Данные задачи
+        idempotency_key (Optional[str]): Ключ идемпотентности
         service (TodoService): Сервис задач
+        idempotency (IdempotencyService): Сервис ключей идемпотентности
+
+    Returns:
+        dict: Словарь с данными созданной задачи
+
+    Raises:
+        HTTPException: Если данные некорректны или ключ идемпотентности
+            использован с другим запросом
+    """
+    if not idempotency_key:
+        return _create_todo(todo_data, service)
+
+    fingerprint = request_fingerprint("POST", router.prefix + "/", todo_data)
+    try:
+        status_code, body, replayed = idempotency.execute(
+            idempotency_key,
+            fingerprint,
+            # Задача фиксируется одной транзакцией с сохранённым ответом
+            lambda: (201, _create_todo(todo_data, service, commit=False)),
+        )
+    except IdempotencyKeyMismatch as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyKeyInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if not replayed:
+        # Задача зафиксирована вместе с ответом в IdempotencyService.execute
+        service.invalidate_reads()
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=status_code, content=body, headers=headers)
+
+
+def _create_todo(todo_data: dict, service: TodoService, commit: bool = True) -> dict:
+    """
+    Создание задачи и формирование тела ответа
+
+    Args:
+        todo_data (dict): Данные задачи
+        service (TodoService): Сервис задач
+        commit (bool): Зафиксировать транзакцию
 
     Returns:
         dict: Словарь с данными созданной задачи
@@ -102,7 +226,7 @@ async def create_todo(
                 status_code=400, detail="Поле 'title' обязательно для заполнения"
             )
 
-        todo = service.create_todo(title, description)
+        todo = service.create_todo(title, description, commit=commit)
 
         return {"status": "success", "data": todo.to_dict()}
     except ValueError as e:
@@ -110,7 +234,7 @@ async def create_todo(
 
 
 @router.put("/{todo_id}", response_model=dict)
-async def update_todo(
+def update_todo(
     todo_id: int, todo_data: dict, service: TodoService = Depends(get_todo_service)
 ):
     """
@@ -165,7 +289,7 @@ async def update_todo(
 
 
 @router.delete("/{todo_id}", response_model=dict)
-async def delete_todo(todo_id: int, service: TodoService = Depends(get_todo_service)):
+def delete_todo(todo_id: int, service: TodoService = Depends(get_todo_service)):
     """
     Удаление задачи
 
@@ -184,19 +308,3 @@ async def delete_todo(todo_id: int, service: TodoService = Depends(get_todo_serv
         raise HTTPException(status_code=404, detail="Задача не найдена")
 
     return {"status": "success", "message": "Задача успешно удалена"}
-
-
-@router.get("/stats", response_model=dict)
-async def get_stats(service: TodoService = Depends(get_todo_service)):
-    """
-    Получение статистики по задачам
-
-    Args:
-        service (TodoService): Сервис задач
-
-    Returns:
-        dict: Словарь со статистикой
-    """
-    stats = service.get_stats()
-
-    return {"status": "success", "data": stats}
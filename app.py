@@ -2,17 +2,32 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from config import Config
-from database.db import init_database
+from database.db import pool_metrics, prewarm_pool
+from migrations.runner import ensure_schema
 from api.todo_api import router as todo_router
+from services.todo_service import read_flight
+from services.archive_service import TodoArchiver
+from repositories.factory import get_memory_repository
+from middleware.admission import AdmissionMiddleware, admission_stats
+from api.formats import compressed_cache
 
 app = FastAPI(
     title=Config.API_TITLE,
     version=Config.API_VERSION,
-    openapi_url="/openapi.json",
-    docs_url="/docs",
-    redoc_url="/redoc",
+    openapi_url="/openapi.json" if Config.DOCS_ENABLED else None,
+    docs_url="/docs" if Config.DOCS_ENABLED else None,
+    redoc_url="/redoc" if Config.DOCS_ENABLED else None,
 )
 
+# Контроль допуска добавляется первым, чтобы CORS оборачивал и ответы 503
+if Config.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        limits=Config.ADMISSION_LIMITS,
+        exempt_paths=Config.ADMISSION_EXEMPT_PATHS,
+        route_pools=Config.ADMISSION_ROUTE_POOLS,
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -23,11 +38,25 @@ app.add_middleware(
 
 app.include_router(todo_router)
 
+archiver = TodoArchiver()
+
 
 @app.on_event("startup")
 async def startup_event():
     """Инициализация приложения при запуске"""
-    init_database()
+    ensure_schema()
+    if Config.DB_POOL_PREWARM:
+        prewarm_pool()
+    if Config.ARCHIVE_ENABLED:
+        archiver.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Остановка фоновых задач при завершении"""
+    archiver.stop()
+    if Config.REPOSITORY_BACKEND == "memory":
+        get_memory_repository().snapshot()
 
 
 @app.get("/", tags=["root"])
@@ -41,8 +70,8 @@ async def root():
     return {
         "message": "Добро пожаловать в To-Do List API",
         "version": Config.API_VERSION,
-        "docs": "/docs",
-        "redoc": "/redoc",
+        "docs": app.docs_url,
+        "redoc": app.redoc_url,
     }
 
 
@@ -57,6 +86,25 @@ async def health_check():
     return {"status": "healthy", "message": "To-Do List API работает нормально"}
 
 
+@app.get("/metrics", tags=["health"])
+async def metrics():
+    """
+    Внутренние метрики приложения
+
+    Returns:
+        dict: Счётчики объединения чтений и контроля допуска
+    """
+    return {
+        "status": "success",
+        "data": {
+            "single_flight": read_flight.stats(),
+            "admission": admission_stats(),
+            "compressed_cache": compressed_cache.stats(),
+            "db_pool": pool_metrics.stats(),
+        },
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app:app", host="127.0.0.1", port=8000, reload=Config.DEBUG, log_level="info"
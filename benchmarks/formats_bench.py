@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк форматов ответа со списком задач: размер и время кодирования.
+
+Сравнивает JSON (построчный и колоночный, ISO и epoch-время) и MessagePack,
+без сжатия и со сжатием gzip/brotli. MessagePack и brotli пропускаются,
+если не установлены.
+
+Запуск:
+    python -m benchmarks.formats_bench
+    python -m benchmarks.formats_bench --items 1000 --repeat 200
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from api.formats import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    brotli,
+    compress,
+    encode_body,
+    msgpack,
+    todos_payload,
+)
+from models.todo import Todo
+
+
+def make_todos(count: int) -> list:
+    """Создание списка задач для кодирования"""
+    now = datetime.now()
+    return [
+        Todo(
+            id=i,
+            title=f"Задача номер {i}",
+            description="Описание задачи" if i % 3 else None,
+            completed=i % 2 == 0,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    """Среднее время вызова fn, миллисекунды"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    todos = make_todos(args.items)
+    variants = [
+        ("json rows iso", JSON_MEDIA_TYPE, False, False),
+        ("json rows epoch", JSON_MEDIA_TYPE, False, True),
+        ("json columnar iso", JSON_MEDIA_TYPE, True, False),
+        ("json columnar epoch", JSON_MEDIA_TYPE, True, True),
+    ]
+    if msgpack is not None:
+        variants += [
+            ("msgpack rows epoch", MSGPACK_MEDIA_TYPE, False, True),
+            ("msgpack columnar epoch", MSGPACK_MEDIA_TYPE, True, True),
+        ]
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    header = f"{'format':<24}{'bytes':>9}{'encode ms':>11}"
+    for encoding in encodings:
+        header += f"{encoding + ' bytes':>12}{encoding + ' ms':>10}"
+    print(header)
+
+    for name, media_type, columnar, epoch in variants:
+
+        def encode():
+            return encode_body(todos_payload(todos, columnar, epoch), media_type)
+
+        body = encode()
+        line = f"{name:<24}{len(body):>9}{timed(encode, args.repeat):>11.2f}"
+        for encoding in encodings:
+            compressed = compress(body, encoding)
+            elapsed = timed(lambda: compress(body, encoding), args.repeat)
+            line += f"{len(compressed):>12}{elapsed:>10.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк дополнительной задержки ключей идемпотентности на пути записи.
+
+Сравнивает создание задачи без ключа, с новым ключом (резервирование +
+сохранение ответа) и повтор с уже использованным ключом (чтение
+сохранённого ответа). Используется отдельный временный файл SQLite.
+
+Запуск:
+    python -m benchmarks.idempotency_bench
+    python -m benchmarks.idempotency_bench --requests 2000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from migrations.runner import MigrationRunner
+from services.todo_service import TodoService
+from services.idempotency_service import IdempotencyService, request_fingerprint
+
+
+def percentile(values, pct: float) -> float:
+    """Перцентиль по списку значений"""
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def measure(fn, count: int) -> list:
+    """Замер задержки count вызовов fn(i), секунды"""
+    timings = []
+    for i in range(count):
+        started = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        MigrationRunner(engine=engine, pause=0).upgrade()
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        todos = TodoService(session)
+        idempotency = IdempotencyService(session)
+
+        def plain(i):
+            todos.create_todo(f"plain {i}")
+
+        def keyed(i):
+            payload = {"title": f"keyed {i}"}
+            # Как в API: задача фиксируется одной транзакцией с ответом
+            _, _, replayed = idempotency.execute(
+                f"key-{i}",
+                request_fingerprint("POST", "/api/v1/todos/", payload),
+                lambda: (
+                    201,
+                    {
+                        "data": todos.create_todo(
+                            payload["title"], commit=False
+                        ).to_dict()
+                    },
+                ),
+            )
+            if not replayed:
+                todos.invalidate_reads()
+
+        results = {
+            "без ключа": measure(plain, args.requests),
+            "новый ключ": measure(keyed, args.requests),
+            "повтор ключа": measure(keyed, args.requests),
+        }
+        session.close()
+        engine.dispose()
+
+    baseline = sum(results["без ключа"]) / args.requests
+    print(f"{'режим':<14}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'vs base':>10}")
+    for name, timings in results.items():
+        mean = sum(timings) / len(timings)
+        print(
+            f"{name:<14}{mean * 1000:>10.3f}"
+            f"{percentile(timings, 50) * 1000:>10.3f}"
+            f"{percentile(timings, 99) * 1000:>10.3f}"
+            f"{mean / baseline:>9.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Локальный тест перегрузки для контроля допуска.
+
+Моделирует насыщенный SQLite: записи сериализуются одной блокировкой
+(один писатель), чтения выполняются параллельно. Генератор нагрузки
+с открытым циклом подаёт шторм записей выше пропускной способности,
+а также поток чтений и /health. Сравниваются два прогона: без контроля
+допуска и с AdmissionMiddleware.
+
+Запуск:
+    python -m benchmarks.overload
+    python -m benchmarks.overload --write-rps 800 --duration 5
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+from config import Config
+from middleware.admission import AdmissionMiddleware
+
+
+def make_backend(write_time: float, read_time: float):
+    """
+    Создание ASGI-приложения, моделирующего насыщенную базу данных
+
+    Args:
+        write_time (float): Время одной записи под блокировкой, секунды
+        read_time (float): Время одного чтения, секунды
+
+    Returns:
+        ASGI-приложение
+    """
+    write_lock = asyncio.Lock()
+
+    async def app(scope, receive, send):
+        if scope["path"] != "/health":
+            if scope["method"] == "POST":
+                async with write_lock:
+                    await asyncio.sleep(write_time)
+            else:
+                await asyncio.sleep(read_time)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    return app
+
+
+async def call(app, method: str, path: str) -> int:
+    """Выполнение одного запроса к ASGI-приложению, возвращает код ответа"""
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {"type": "http", "method": method, "path": path, "headers": []}
+    await app(scope, receive, send)
+    return status
+
+
+async def run_load(app, args) -> dict:
+    """
+    Подача нагрузки с открытым циклом
+
+    Returns:
+        dict: Класс запроса -> список (код ответа, задержка)
+    """
+    results = defaultdict(list)
+    streams = [
+        ("write", "POST", "/api/v1/todos/", args.write_rps),
+        ("read", "GET", "/api/v1/todos/", args.read_rps),
+        ("health", "GET", "/health", args.health_rps),
+    ]
+
+    async def one(kind, method, path):
+        started = time.perf_counter()
+        status = await call(app, method, path)
+        results[kind].append((status, time.perf_counter() - started))
+
+    async def stream(kind, method, path, rps):
+        interval = 1.0 / rps
+        tasks = []
+        deadline = time.perf_counter() + args.duration
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            tasks.append(asyncio.create_task(one(kind, method, path)))
+            next_at += interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        await asyncio.gather(*tasks)
+
+    await asyncio.gather(*(stream(*s) for s in streams))
+    return results
+
+
+def percentile(values, pct: float) -> float:
+    """Перцентиль по отсортированному списку"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def report(title: str, results: dict):
+    """Вывод результатов прогона"""
+    print(f"\n== {title}")
+    print(f"{'class':<8}{'ok':>8}{'shed':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in ("write", "read", "health"):
+        rows = results.get(kind, [])
+        ok = [latency for status, latency in rows if status == 200]
+        shed = sum(1 for status, _ in rows if status == 503)
+        print(
+            f"{kind:<8}{len(ok):>8}{shed:>8}"
+            f"{percentile(ok, 50) * 1000:>10.1f}"
+            f"{percentile(ok, 99) * 1000:>10.1f}"
+            f"{max(ok, default=0) * 1000:>10.1f}"
+        )
+
+
+async def main_async(args):
+    backend = make_backend(args.write_time, args.read_time)
+    report("без контроля допуска", await run_load(backend, args))
+
+    backend = make_backend(args.write_time, args.read_time)
+    guarded = AdmissionMiddleware(
+        backend,
+        limits=Config.ADMISSION_LIMITS,
+        exempt_paths=Config.ADMISSION_EXEMPT_PATHS,
+    )
+    report("с контролем допуска", await run_load(guarded, args))
+    for name, stats in guarded.stats().items():
+        print(f"{name}: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--write-rps", type=float, default=400.0)
+    parser.add_argument("--read-rps", type=float, default=200.0)
+    parser.add_argument("--health-rps", type=float, default=20.0)
+    parser.add_argument("--write-time", type=float, default=0.005)
+    parser.add_argument("--read-time", type=float, default=0.002)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
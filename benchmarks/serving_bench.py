@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк production-запуска: время холодного старта и запросы в секунду
+в зависимости от числа процессов.
+
+Для каждого числа процессов запускается serve.py на отдельной временной
+базе SQLite с заранее созданными задачами. Холодный старт - время от
+запуска процесса до первого успешного ответа /health. Нагрузка подаётся
+клиентами с постоянными соединениями (http.client) в потоках.
+
+Запуск:
+    python -m benchmarks.serving_bench
+    python -m benchmarks.serving_bench --workers 1 2 4 --clients 32 --duration 10
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    """Получение свободного TCP-порта"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port: int, timeout: float) -> bool:
+    """Ожидание первого успешного ответа /health"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/health")
+            if connection.getresponse().status == 200:
+                return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+
+def seed(env: dict, count: int):
+    """Применение миграций и создание задач во временной базе"""
+    script = (
+        "from migrations.runner import MigrationRunner\n"
+        "from database.db import SessionLocal\n"
+        "from services.todo_service import TodoService\n"
+        "MigrationRunner().upgrade()\n"
+        "db = SessionLocal()\n"
+        f"for i in range({count}):\n"
+        "    TodoService(db).create_todo(f'todo {i}')\n"
+        "db.close()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+def load(port: int, path: str, clients: int, duration: float) -> float:
+    """
+    Подача нагрузки с закрытым циклом
+
+    Returns:
+        float: Успешных запросов в секунду
+    """
+    counts = [0] * clients
+    stop = time.monotonic() + duration
+
+    def client(index: int):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        while time.monotonic() < stop:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            if response.status == 200:
+                counts[index] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / (time.monotonic() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--todos", type=int, default=200)
+    parser.add_argument("--path", default="/api/v1/todos/?limit=20")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'cold start s':>14}{'req/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            APP_ENV="production",
+            DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+            PYTHONPATH=ROOT,
+        )
+        seed(env, args.todos)
+        for workers in args.workers:
+            port = free_port()
+            worker_env = dict(env, APP_WORKERS=str(workers), APP_PORT=str(port))
+            started = time.monotonic()
+            process = subprocess.Popen(
+                [sys.executable, "serve.py"],
+                cwd=ROOT,
+                env=worker_env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                if not wait_ready(port, timeout=60):
+                    print(f"{workers:>8}{'не запустился':>14}")
+                    continue
+                cold_start = time.monotonic() - started
+                rps = load(port, args.path, args.clients, args.duration)
+                print(f"{workers:>8}{cold_start:>14.2f}{rps:>10.0f}")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
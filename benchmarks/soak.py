@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Soak-тест памяти: выделения и утечки по эндпоинтам API задач.
+
+Каждый эндпоинт из api/todo_api.py вызывается внутри процесса через ASGI
+(без сети) на отдельной временной базе SQLite. Для каждого эндпоинта
+измеряются:
+- выделения на запрос: пик tracemalloc во время запроса сверх текущего
+  объёма (замер на каждом N-м запросе, --sample-every);
+- удерживаемый рост: прирост отслеживаемой памяти после gc.collect()
+  между началом и концом прогона, всего и на запрос;
+- статистика GC: число сборок поколения 2, прирост числа объектов,
+  gc.garbage;
+- места наибольшего роста (сравнение снимков tracemalloc).
+
+Бюджеты задаются по эндпоинтам (JSON-файл --budgets вида
+{"list": {"alloc_per_request": 2097152}, "default": {...}}; метрики
+эндпоинта дополняют "default"). При превышении бюджета скрипт
+завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.soak
+    python -m benchmarks.soak --requests 1000000 --sample-every 1000
+    python -m benchmarks.soak --endpoints list get --budgets budgets.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from collections import Counter
+from tests import asgi
+
+# Бюджеты по умолчанию (байты): выделения на запрос (средний пик)
+# и удерживаемый рост на запрос после сборки мусора
+DEFAULT_BUDGETS = {
+    "default": {"alloc_per_request": 256 * 1024, "retained_per_request": 64},
+    "list": {"alloc_per_request": 2 * 1024 * 1024, "retained_per_request": 64},
+}
+
+ENDPOINTS = ("list", "get", "create", "update", "delete", "stats")
+
+
+def configure_environment(tmp_dir: str):
+    """Настройка окружения до импорта приложения: временная база, без SQL-лога"""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp_dir, 'soak.db')}"
+    os.environ["APP_ENV"] = "production"
+    os.environ["APP_SQL_ECHO"] = "0"
+    os.environ["APP_REPOSITORY"] = os.environ.get("APP_REPOSITORY", "sqlite")
+
+
+def make_scenarios(app, seed_ids: list):
+    """
+    Сценарии эндпоинтов: (подготовка, измеряемый запрос) для i-го запроса
+
+    Подготовка не измеряется (например, создание задачи перед удалением).
+    """
+    prefix = "/api/v1/todos"
+    pending = []
+
+    async def prepare_delete(i):
+        response = await asgi.request(
+            app, "POST", f"{prefix}/", body={"title": f"delete {i}"}
+        )
+        pending.append(response.json()["data"]["id"])
+
+    async def noop(i):
+        return None
+
+    def pick(i):
+        return seed_ids[i % len(seed_ids)]
+
+    return {
+        "list": (noop, lambda i: asgi.request(app, "GET", f"{prefix}/", "limit=100")),
+        "get": (noop, lambda i: asgi.request(app, "GET", f"{prefix}/{pick(i)}")),
+        "create": (
+            noop,
+            lambda i: asgi.request(app, "POST", f"{prefix}/", body={"title": f"c {i}"}),
+        ),
+        "update": (
+            noop,
+            lambda i: asgi.request(
+                app, "PUT", f"{prefix}/{pick(i)}", body={"completed": i % 2 == 0}
+            ),
+        ),
+        "delete": (
+            prepare_delete,
+            lambda i: asgi.request(app, "DELETE", f"{prefix}/{pending.pop()}"),
+        ),
+        "stats": (noop, lambda i: asgi.request(app, "GET", f"{prefix}/stats")),
+    }
+
+
+def traced_after_gc() -> int:
+    """Текущий объём отслеживаемой памяти после полной сборки мусора"""
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def take_snapshot() -> tracemalloc.Snapshot:
+    """Снимок tracemalloc без выделений скрипта, ASGI-клиента и tracemalloc"""
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, asgi.__file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        )
+    )
+
+
+async def soak_endpoint(name, prepare, call, args) -> dict:
+    """
+    Прогон одного эндпоинта
+
+    Returns:
+        dict: Результаты замеров
+    """
+    for i in range(args.warmup):
+        await prepare(i)
+        await call(i)
+
+    retained_before = traced_after_gc()
+    objects_before = len(gc.get_objects())
+    garbage_before = len(gc.garbage)
+    gc_before = gc.get_stats()[2]["collections"]
+    snapshot_before = take_snapshot() if args.top else None
+
+    # Накопительные счётчики вместо списка замеров, чтобы сам скрипт
+    # не давал роста памяти на длинных прогонах
+    statuses = Counter()
+    samples = alloc_total = alloc_max = 0
+    for i in range(args.warmup, args.warmup + args.requests):
+        await prepare(i)
+        sampled = i % args.sample_every == 0
+        if sampled:
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        response = await call(i)
+        statuses[response.status] += 1
+        if sampled:
+            allocated = tracemalloc.get_traced_memory()[1] - current
+            samples += 1
+            alloc_total += allocated
+            alloc_max = max(alloc_max, allocated)
+
+    gc_gen2 = gc.get_stats()[2]["collections"] - gc_before
+    retained = traced_after_gc() - retained_before
+    objects_delta = len(gc.get_objects()) - objects_before
+    top = []
+    if args.top:
+        stats = take_snapshot().compare_to(snapshot_before, "lineno")
+        top = [str(stat) for stat in stats[: args.top] if stat.size_diff > 0]
+
+    return {
+        "endpoint": name,
+        "requests": args.requests,
+        "statuses": dict(statuses),
+        "alloc_per_request": alloc_total / samples if samples else 0,
+        "alloc_max": alloc_max,
+        "retained": retained,
+        "retained_per_request": retained / args.requests,
+        "gc_gen2": gc_gen2,
+        "objects_delta": objects_delta,
+        "garbage_delta": len(gc.garbage) - garbage_before,
+        "top": top,
+    }
+
+
+def check_budgets(results: list, budgets: dict) -> list:
+    """
+    Проверка результатов по бюджетам
+
+    Returns:
+        list: Описания превышений
+    """
+    violations = []
+    for result in results:
+        budget = {**budgets.get("default", {}), **budgets.get(result["endpoint"], {})}
+        for metric, limit in budget.items():
+            if result[metric] > limit:
+                violations.append(
+                    f"{result['endpoint']}: {metric} = {result[metric]:.0f} "
+                    f"> {limit:.0f}"
+                )
+    return violations
+
+
+def report(results: list):
+    """Вывод таблицы результатов"""
+    print(
+        f"{'endpoint':<10}{'requests':>10}{'alloc/req':>12}{'alloc max':>12}"
+        f"{'retained':>12}{'ret/req':>10}{'gc2':>6}{'objects':>9}  statuses"
+    )
+    for r in results:
+        print(
+            f"{r['endpoint']:<10}{r['requests']:>10}"
+            f"{r['alloc_per_request']:>12.0f}{r['alloc_max']:>12}"
+            f"{r['retained']:>12}{r['retained_per_request']:>10.2f}"
+            f"{r['gc_gen2']:>6}{r['objects_delta']:>9}  {r['statuses']}"
+        )
+        for line in r["top"]:
+            print(f"    {line}")
+
+
+async def run(args) -> list:
+    """Подготовка базы и прогон выбранных эндпоинтов"""
+    from migrations.runner import MigrationRunner
+    from services.todo_service import TodoService
+    from database.db import SessionLocal
+    from app import app
+
+    MigrationRunner(pause=0).upgrade()
+    db = SessionLocal()
+    service = TodoService(db)
+    seed_ids = [service.create_todo(f"seed {i}").id for i in range(args.seed)]
+    db.close()
+
+    scenarios = make_scenarios(app, seed_ids)
+    tracemalloc.start(args.frames)
+    results = []
+    try:
+        for name in args.endpoints:
+            prepare, call = scenarios[name]
+            results.append(await soak_endpoint(name, prepare, call, args))
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=200)
+    parser.add_argument("--sample-every", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=1)
+    parser.add_argument("--top", type=int, default=0, help="Мест роста на эндпоинт")
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--budgets", help="JSON-файл бюджетов по эндпоинтам")
+    parser.add_argument("--json", help="Сохранить результаты в JSON-файл")
+    args = parser.parse_args()
+
+    budgets = {name: dict(limits) for name, limits in DEFAULT_BUDGETS.items()}
+    if args.budgets:
+        with open(args.budgets, encoding="utf-8") as f:
+            for name, limits in json.load(f).items():
+                budgets.setdefault(name, {}).update(limits)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_environment(tmp)
+        results = asyncio.run(run(args))
+
+    report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    violations = check_budgets(results, budgets)
+    if violations:
+        print("\nПревышены бюджеты памяти:")
+        for violation in violations:
+            print(f"  {violation}")
+        sys.exit(1)
+    print("\nБюджеты памяти соблюдены")
+
+
+if __name__ == "__main__":
+    main()
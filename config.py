@@ -1,14 +1,90 @@
 import os
 
 
+def _env_flag(name: str, default: bool) -> bool:
+    """Чтение логического флага из переменной окружения"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
 class Config:
-    DATABASE_URL = "sqlite:///./todo.db"
+    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./todo.db")
+
+    ENV = os.getenv("APP_ENV", "development")
+    DEBUG = _env_flag("APP_DEBUG", ENV == "development")
 
-    DEBUG = True
-    ENV = "development"
+    # Документация API (/docs, /redoc, /openapi.json) и вывод SQL-запросов
+    DOCS_ENABLED = _env_flag("APP_DOCS", ENV == "development")
+    SQL_ECHO = _env_flag("APP_SQL_ECHO", DEBUG)
+
+    # Production-запуск (serve.py): адрес, число процессов (0 - по числу ядер)
+    HOST = os.getenv("APP_HOST", "127.0.0.1")
+    PORT = int(os.getenv("APP_PORT", "8000"))
+    WORKERS = int(os.getenv("APP_WORKERS", "0"))
+
+    # Пул соединений с базой данных и его прогрев при запуске
+    DB_POOL_SIZE = int(os.getenv("APP_DB_POOL_SIZE", "5"))
+    DB_POOL_PREWARM = _env_flag("APP_DB_POOL_PREWARM", True)
 
     API_TITLE = "To-Do List API"
     API_VERSION = "1.0.0"
     OPENAPI_VERSION = "3.0.2"
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Контроль допуска: параметры пулов (одновременные запросы, длина очереди,
+    # допустимое ожидание в очереди в секундах)
+    ADMISSION_ENABLED = True
+    ADMISSION_LIMITS = {
+        "read": {"max_concurrency": 32, "max_queue": 256, "deadline": 2.0},
+        "write": {"max_concurrency": 4, "max_queue": 64, "deadline": 1.0},
+    }
+    # Пути, которые никогда не ограничиваются
+    ADMISSION_EXEMPT_PATHS = ("/", "/health", "/metrics")
+    # Префикс пути -> имя пула, если маршруту нужен отдельный пул
+    ADMISSION_ROUTE_POOLS = {}
+
+    # Ключи идемпотентности: срок хранения ответа, ожидание одновременного
+    # запроса с тем же ключом и срок, после которого незавершённое
+    # резервирование считается брошенным (секунды). Ожидающий запрос держит
+    # поток и слот пула записи, поэтому ждёт не дольше дедлайна записи,
+    # затем получает 409
+    IDEMPOTENCY_TTL_SECONDS = 24 * 60 * 60
+    IDEMPOTENCY_WAIT_TIMEOUT = ADMISSION_LIMITS["write"]["deadline"]
+    IDEMPOTENCY_LOCK_TIMEOUT = 60.0
+    # Удаление истёкших записей на каждом N-м резервировании
+    IDEMPOTENCY_PURGE_EVERY = 100
+
+    # Фоновая архивация выполненных задач в таблицу todos_archive
+    # (при нескольких процессах serve.py выполняет её в основном процессе
+    # и отключает в процессах-обработчиках)
+    ARCHIVE_ENABLED = _env_flag("APP_ARCHIVE_ENABLED", True)
+    ARCHIVE_AFTER_DAYS = 30
+    ARCHIVE_BATCH_SIZE = 500
+    # Интервал между запусками и пауза между порциями (секунды)
+    ARCHIVE_INTERVAL_SECONDS = 600
+    ARCHIVE_BATCH_PAUSE = 0.05
+
+    # Миграции схемы: применять ожидающие миграции при запуске приложения
+    # (в production миграции запускаются отдельно: python -m migrations.runner)
+    AUTO_MIGRATE = ENV == "development"
+    MIGRATION_CHUNK_SIZE = 1000
+    MIGRATION_CHUNK_PAUSE = 0.01
+    # Оценочная скорость для режима --dry-run (строк в секунду)
+    MIGRATION_BACKFILL_ROWS_PER_SECOND = 50000
+    MIGRATION_INDEX_ROWS_PER_SECOND = 500000
+
+    # Сжатие ответов со списками: минимальный размер тела (байт), уровни
+    # сжатия и размер кэша сжатых тел
+    COMPRESSION_MIN_SIZE = 1024
+    GZIP_LEVEL = 6
+    BROTLI_QUALITY = 5
+    COMPRESSION_CACHE_SIZE = 256
+
+    # Хранилище задач: sqlite или memory (в памяти процесса; снимок
+    # сохраняется при остановке и загружается при запуске, если задан путь).
+    # С хранилищем memory serve.py всегда запускает один процесс
+    REPOSITORY_BACKEND = os.getenv("APP_REPOSITORY", "sqlite")
+    MEMORY_SNAPSHOT_PATH = os.getenv("APP_MEMORY_SNAPSHOT")
@@ -3,18 +3,26 @@ from sqlalchemy import (
     Column,
     Integer,
     String,
+    Text,
     Boolean,
     DateTime,
+    Index,
     MetaData,
 )
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Optional
 import os
+import threading
+import time
 from config import Config
 
 # Создание движка базы данных
-engine = create_engine(Config.DATABASE_URL, echo=Config.DEBUG)
+engine = create_engine(
+    Config.DATABASE_URL, echo=Config.SQL_ECHO, pool_size=Config.DB_POOL_SIZE
+)
 
 # Создание базового класса для моделей
 Base = declarative_base()
@@ -34,22 +42,207 @@ class TodoDB(Base):
     completed = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.now)
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Время выполнения задачи (None, пока задача не выполнена)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_todos_completed_updated_at", "completed", "updated_at"),
+    )
+
+
+class TodoArchiveDB(Base):
+    """Архивная (холодная) задача: выполненные задачи, перенесённые из todos"""
+
+    __tablename__ = "todos_archive"
+
+    # Идентификатор сохраняется из таблицы todos
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String(255), nullable=False)
+    description = Column(String(1000), nullable=True)
+    completed = Column(Boolean, default=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    completed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.now, index=True)
+
+
+class IdSequenceDB(Base):
+    """
+    Счётчик выданных ID: новые задачи получают ID больше всех выданных,
+    поэтому ID удалённых и архивных задач не выдаются повторно
+    """
+
+    __tablename__ = "id_sequences"
+
+    name = Column(String(64), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKeyDB(Base):
+    """Сохранённый ответ для ключа идемпотентности"""
+
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL, пока первый запрос с этим ключом ещё выполняется
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class PoolCheckoutMetrics:
+    """Метрики ожидания соединения из пула"""
+
+    def __init__(self):
+        """Инициализация метрик"""
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        """
+        Учёт одного получения соединения
+
+        Args:
+            wait (float): Время ожидания соединения, секунды
+        """
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> dict:
+        """
+        Получение метрик пула
+
+        Returns:
+            dict: Словарь с метриками ожидания и состоянием пула
+        """
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "avg_wait": (
+                    round(self.total_wait / self.checkouts, 6)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_wait": round(self.max_wait, 6),
+                "checked_out": engine.pool.checkedout(),
+                "pool_size": Config.DB_POOL_SIZE,
+            }
+
+
+pool_metrics = PoolCheckoutMetrics()
 
 
-def get_db():
+class LazySession:
     """
-    Получение сессии базы данных
+    Сессия базы данных запроса, открываемая при первом обращении.
+
+    Соединение берётся из пула только когда репозиторий выполняет запрос,
+    поэтому запросы, обслуженные без базы данных, не занимают пул.
+    """
+
+    def __init__(self, factory: sessionmaker = SessionLocal):
+        """
+        Инициализация сессии
+
+        Args:
+            factory (sessionmaker): Фабрика сессий
+        """
+        self._factory = factory
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Session:
+        """Сессия базы данных (создаётся и подключается при первом обращении)"""
+        if self._session is None:
+            started = time.perf_counter()
+            session = self._factory()
+            session.connection()
+            pool_metrics.record(time.perf_counter() - started)
+            self._session = session
+        return self._session
+
+    @property
+    def opened(self) -> bool:
+        """Была ли сессия открыта"""
+        return self._session is not None
+
+    def close(self):
+        """Закрытие сессии и возврат соединения в пул, если она была открыта"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+_request_session: ContextVar[Optional[LazySession]] = ContextVar(
+    "request_session", default=None
+)
+
+
+async def request_session():
+    """
+    Открытие области сессии запроса (зависимость FastAPI)
 
     Yields:
-        Session: Сессия базы данных
+        LazySession: Ленивая сессия текущего запроса
     """
-    db = SessionLocal()
+    lazy = LazySession()
+    token = _request_session.set(lazy)
     try:
-        yield db
+        yield lazy
     finally:
-        db.close()
+        lazy.close()
+        _request_session.reset(token)
+
+
+def current_session() -> Session:
+    """
+    Получение сессии текущего запроса
+
+    Returns:
+        Session: Сессия базы данных
+
+    Raises:
+        RuntimeError: Если вызвано вне области запроса
+    """
+    lazy = _request_session.get()
+    if lazy is None:
+        raise RuntimeError("Нет активной сессии запроса")
+    return lazy.session
+
+
+def prewarm_pool():
+    """Открытие соединений пула заранее, чтобы первые запросы их не ждали"""
+    connections = [engine.connect() for _ in range(Config.DB_POOL_SIZE)]
+    for connection in connections:
+        connection.exec_driver_sql("SELECT 1")
+        connection.close()
+
+
+class RequestSessionMixin:
+    """
+    Сессия базы данных для репозиториев: явная или ленивая сессия текущего
+    запроса. Без явной сессии экземпляр можно переиспользовать между запросами.
+    """
+
+    def __init__(self, db: Optional[Session] = None):
+        """
+        Инициализация репозитория
 
+        Args:
+            db (Optional[Session]): Сессия базы данных (по умолчанию - сессия
+                текущего запроса)
+        """
+        self._db = db
 
-def init_database():
-    """Инициализация базы данных (создание таблиц)"""
-    Base.metadata.create_all(bind=engine)
+    @property
+    def db(self) -> Session:
+        """Сессия базы данных (явная или текущего запроса)"""
+        if self._db is not None:
+            return self._db
+        return current_session()
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+
+class AdmissionRejected(Exception):
+    """Запрос отклонён контролем допуска"""
+
+    def __init__(self, retry_after: float, reason: str):
+        """
+        Инициализация исключения
+
+        Args:
+            retry_after (float): Рекомендуемая пауза перед повтором, секунды
+            reason (str): Причина отказа
+        """
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionPool:
+    """
+    Пул допуска для класса маршрутов: ограничение одновременных запросов
+    и ограниченная очередь ожидания.
+
+    Время обслуживания оценивается скользящим средним (EWMA), по нему
+    оценивается ожидание в очереди. Если оценка превышает дедлайн, запрос
+    отклоняется сразу, не занимая место в очереди.
+    """
+
+    # Вес нового измерения в скользящем среднем
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        deadline: float,
+        initial_service_time: float = 0.05,
+    ):
+        """
+        Инициализация пула
+
+        Args:
+            name (str): Имя пула
+            max_concurrency (int): Максимум одновременно выполняемых запросов
+            max_queue (int): Максимальная длина очереди ожидания
+            deadline (float): Максимально допустимое ожидание в очереди, секунды
+            initial_service_time (float): Начальная оценка времени обслуживания
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.avg_service_time = initial_service_time
+        self.avg_queue_time = 0.0
+        self.max_queue_time = 0.0
+        self.admitted = 0
+        self.rejected = 0
+
+    def estimated_wait(self) -> float:
+        """
+        Оценка ожидания для нового запроса
+
+        Returns:
+            float: Ожидаемое время в очереди, секунды
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            return 0.0
+        ahead = len(self._waiters) + 1
+        return ahead * self.avg_service_time / self.max_concurrency
+
+    async def acquire(self) -> float:
+        """
+        Получение слота выполнения
+
+        Returns:
+            float: Время, проведённое в очереди, секунды
+
+        Raises:
+            AdmissionRejected: Если очередь переполнена или ожидание превысит дедлайн
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+
+        estimate = self.estimated_wait()
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise AdmissionRejected(estimate, "очередь переполнена")
+        if estimate > self.deadline:
+            self.rejected += 1
+            raise AdmissionRejected(
+                estimate, "ожидаемое время ожидания превышает дедлайн"
+            )
+
+        started = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.deadline)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Слот уже передан этому запросу, возвращаем его
+                if isinstance(e, asyncio.CancelledError):
+                    self.release()
+                    raise
+            else:
+                waiter.cancel()
+                self._remove_waiter(waiter)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self.rejected += 1
+                raise AdmissionRejected(self.estimated_wait(), "истёк дедлайн ожидания")
+
+        queue_time = time.monotonic() - started
+        self.admitted += 1
+        self.avg_queue_time += self.EWMA_ALPHA * (queue_time - self.avg_queue_time)
+        self.max_queue_time = max(self.max_queue_time, queue_time)
+        return queue_time
+
+    def release(self, service_time: Optional[float] = None):
+        """
+        Освобождение слота выполнения
+
+        Args:
+            service_time (Optional[float]): Время выполнения запроса, секунды
+        """
+        if service_time is not None:
+            self.avg_service_time += self.EWMA_ALPHA * (
+                service_time - self.avg_service_time
+            )
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Слот передаётся следующему ожидающему без освобождения
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _remove_waiter(self, waiter: asyncio.Future):
+        """Удаление ожидающего запроса из очереди"""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def stats(self) -> dict:
+        """
+        Получение состояния пула
+
+        Returns:
+            dict: Словарь со счётчиками пула
+        """
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "deadline": self.deadline,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_service_time": round(self.avg_service_time, 6),
+            "avg_queue_time": round(self.avg_queue_time, 6),
+            "max_queue_time": round(self.max_queue_time, 6),
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware контроля допуска и сброса нагрузки.
+
+    Запросы распределяются по пулам: чтения (GET/HEAD/OPTIONS) и записи
+    получают отдельные пулы, поэтому шторм записей не вытесняет чтения.
+    Служебные маршруты (например, /health) не ограничиваются.
+    При перегрузке запрос отклоняется с 503 и заголовком Retry-After.
+    """
+
+    READ_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(
+        self,
+        app,
+        limits: Dict[str, dict],
+        exempt_paths: Iterable[str] = (),
+        route_pools: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Инициализация middleware
+
+        Args:
+            app: Оборачиваемое ASGI-приложение
+            limits (Dict[str, dict]): Параметры пулов по имени
+                (max_concurrency, max_queue, deadline)
+            exempt_paths (Iterable[str]): Пути, не подлежащие ограничению
+            route_pools (Optional[Dict[str, str]]): Префикс пути -> имя пула,
+                переопределяющее выбор по методу
+        """
+        self.app = app
+        self.pools = {
+            name: AdmissionPool(name, **params) for name, params in limits.items()
+        }
+        self.exempt_paths = frozenset(exempt_paths)
+        self.route_pools = route_pools or {}
+        register_admission(self)
+
+    def classify(self, method: str, path: str) -> Optional[AdmissionPool]:
+        """
+        Выбор пула для запроса
+
+        Args:
+            method (str): HTTP-метод
+            path (str): Путь запроса
+
+        Returns:
+            Optional[AdmissionPool]: Пул или None, если запрос не ограничивается
+        """
+        if path in self.exempt_paths:
+            return None
+        for prefix, pool_name in self.route_pools.items():
+            if path.startswith(prefix):
+                return self.pools.get(pool_name)
+        if method in self.READ_METHODS:
+            return self.pools.get("read")
+        return self.pools.get("write")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        pool = self.classify(scope["method"], scope["path"])
+        if pool is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await pool.acquire()
+        except AdmissionRejected as e:
+            await self._reject(send, e)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            pool.release(time.monotonic() - started)
+
+    async def _reject(self, send, rejection: AdmissionRejected):
+        """Отправка ответа 503 с заголовком Retry-After"""
+        body = json.dumps(
+            {"detail": f"Сервис перегружен: {rejection.reason}"}, ensure_ascii=False
+        ).encode("utf-8")
+        retry_after = max(1, math.ceil(rejection.retry_after))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(retry_after).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        """
+        Получение состояния всех пулов
+
+        Returns:
+            dict: Словарь пул -> счётчики
+        """
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+# Экземпляры middleware, созданные приложением (для метрик)
+_instances = []
+
+
+def register_admission(middleware: AdmissionMiddleware):
+    """Регистрация экземпляра middleware для вывода метрик"""
+    _instances.append(middleware)
+
+
+def admission_stats() -> dict:
+    """
+    Получение метрик контроля допуска
+
+    Returns:
+        dict: Состояние пулов последнего созданного экземпляра middleware
+    """
+    if not _instances:
+        return {}
+    return _instances[-1].stats()
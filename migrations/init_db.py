@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
 Скрипт для инициализации базы данных.
-Создает необходимые таблицы в базе данных SQLite.
+Применяет ожидающие миграции схемы в базе данных SQLite.
 """
 
-from database.db import init_database, engine, Base, TodoDB
+from database.db import engine
+from migrations.runner import MigrationRunner
 from sqlalchemy import text
 import logging
 
@@ -14,12 +15,11 @@ logger = logging.getLogger(__name__)
 
 
 def create_tables():
-    """Создание таблиц в базе данных"""
-    logger.info("Создание таблиц в базе данных...")
+    """Создание таблиц в базе данных (применение ожидающих миграций)"""
+    logger.info("Применение миграций схемы...")
     try:
-        # Создание всех таблиц
-        Base.metadata.create_all(bind=engine)
-        logger.info("Таблицы успешно созданы")
+        applied = MigrationRunner().upgrade()
+        logger.info(f"Применены миграции: {applied}")
     except Exception as e:
         logger.error(f"Ошибка при создании таблиц: {e}")
         raise
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Версионированный запуск миграций схемы базы данных.
+
+Применённые версии хранятся в таблице schema_migrations, поэтому каждая
+миграция выполняется один раз. Заполнение данных (backfill) идёт
+порциями по ID, каждая порция в отдельной короткой транзакции, а позиция
+сохраняется вместе с порцией: прерванную миграцию можно продолжить.
+
+Запуск:
+    python -m migrations.runner
+    python -m migrations.runner --dry-run
+    python -m migrations.runner --chunk-size 5000 --pause 0.05
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError
+from config import Config
+from database.db import engine as default_engine
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+schema_migrations = Table(
+    "schema_migrations",
+    metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    # Номер текущего шага заполнения данных и позиция (последний ID) в нём
+    Column("step", Integer, nullable=False, default=0),
+    Column("cursor", Integer, nullable=False, default=0),
+    Column("completed", Boolean, nullable=False, default=False),
+    Column("applied_at", DateTime, default=datetime.now),
+)
+
+
+class SchemaOutdated(Exception):
+    """Схема базы данных устарела, а автоматическое применение миграций отключено"""
+
+
+class Backfill:
+    """Заполнение данных в таблице порциями по ID"""
+
+    def __init__(self, table: str, where: str, assignments: str):
+        """
+        Инициализация шага заполнения
+
+        Args:
+            table (str): Имя таблицы (с целочисленной колонкой id)
+            where (str): SQL-условие строк, которые нужно обновить
+            assignments (str): SQL-выражение SET
+        """
+        self.table = table
+        self.where = where
+        self.assignments = assignments
+
+    def count(self, connection: Connection) -> int:
+        """
+        Количество строк, которые осталось обновить
+
+        Args:
+            connection (Connection): Соединение с базой данных
+
+        Returns:
+            int: Количество строк
+        """
+        return connection.execute(
+            text(f"SELECT COUNT(*) FROM {self.table} WHERE {self.where}")
+        ).scalar()
+
+    def run_chunk(
+        self, connection: Connection, cursor: int, chunk_size: int
+    ) -> Optional[int]:
+        """
+        Обновление одной порции строк с ID больше cursor
+
+        Args:
+            connection (Connection): Соединение с открытой транзакцией
+            cursor (int): Последний обработанный ID
+            chunk_size (int): Размер порции
+
+        Returns:
+            Optional[int]: Последний ID порции или None, если строк не осталось
+        """
+        ids = (
+            connection.execute(
+                text(
+                    f"SELECT id FROM {self.table} "
+                    f"WHERE id > :cursor AND ({self.where}) "
+                    f"ORDER BY id LIMIT :limit"
+                ),
+                {"cursor": cursor, "limit": chunk_size},
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return None
+
+        connection.execute(
+            text(
+                f"UPDATE {self.table} SET {self.assignments} "
+                f"WHERE id >= :first AND id <= :last AND ({self.where})"
+            ),
+            {"first": ids[0], "last": ids[-1]},
+        )
+        return ids[-1]
+
+
+class Migration:
+    """Версионированная миграция схемы"""
+
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        upgrade: Optional[Callable[[Connection], None]] = None,
+        rebuilds: Iterable[str] = (),
+        backfills: Iterable[Backfill] = (),
+    ):
+        """
+        Инициализация миграции
+
+        Args:
+            version (int): Номер версии схемы
+            name (str): Название миграции
+            upgrade (Optional[Callable[[Connection], None]]): Идемпотентные
+                изменения схемы
+            rebuilds (Iterable[str]): Таблицы, которые upgrade читает целиком
+                (например, при построении индекса), для оценки времени
+            backfills (Iterable[Backfill]): Шаги заполнения данных
+        """
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.rebuilds = list(rebuilds)
+        self.backfills = list(backfills)
+
+    def __repr__(self) -> str:
+        """Строковое представление миграции"""
+        return f"<Migration({self.version}, '{self.name}')>"
+
+
+class MigrationRunner:
+    """Применение ожидающих миграций"""
+
+    def __init__(
+        self,
+        engine: Engine = default_engine,
+        migrations: Optional[List[Migration]] = None,
+        chunk_size: int = Config.MIGRATION_CHUNK_SIZE,
+        pause: float = Config.MIGRATION_CHUNK_PAUSE,
+    ):
+        """
+        Инициализация запуска миграций
+
+        Args:
+            engine (Engine): Движок базы данных
+            migrations (Optional[List[Migration]]): Миграции (по умолчанию все)
+            chunk_size (int): Количество строк в порции заполнения
+            pause (float): Пауза между порциями, секунды
+        """
+        if migrations is None:
+            from migrations.versions import MIGRATIONS
+
+            migrations = MIGRATIONS
+        self.engine = engine
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+        self.chunk_size = chunk_size
+        self.pause = pause
+
+    def applied(self) -> Dict[int, dict]:
+        """
+        Получение применённых (в том числе частично) миграций
+
+        Returns:
+            Dict[int, dict]: Версия -> строка таблицы schema_migrations
+        """
+        with self.engine.connect() as connection:
+            if not inspect(connection).has_table(schema_migrations.name):
+                return {}
+            rows = connection.execute(select(schema_migrations)).mappings().all()
+        return {row["version"]: dict(row) for row in rows}
+
+    def current_version(self) -> int:
+        """
+        Получение текущей версии схемы
+
+        Returns:
+            int: Максимальная полностью применённая версия (0 для пустой базы)
+        """
+        with self.engine.connect() as connection:
+            if not inspect(connection).has_table(schema_migrations.name):
+                return 0
+            return (
+                connection.execute(
+                    select(func.max(schema_migrations.c.version)).where(
+                        schema_migrations.c.completed.is_(True)
+                    )
+                ).scalar()
+                or 0
+            )
+
+    def pending(self) -> List[Migration]:
+        """
+        Получение ожидающих миграций
+
+        Returns:
+            List[Migration]: Миграции, которые не применены полностью
+        """
+        applied = self.applied()
+        return [
+            m
+            for m in self.migrations
+            if not applied.get(m.version, {}).get("completed", False)
+        ]
+
+    def is_current(self) -> bool:
+        """
+        Проверка, что схема актуальна
+
+        Returns:
+            bool: True, если ожидающих миграций нет
+        """
+        return not self.pending()
+
+    def upgrade(self) -> List[int]:
+        """
+        Применение всех ожидающих миграций
+
+        Returns:
+            List[int]: Версии применённых миграций
+        """
+        metadata.create_all(bind=self.engine)
+        applied = self.applied()
+        done = []
+        for migration in self.migrations:
+            row = applied.get(migration.version)
+            if row and row["completed"]:
+                continue
+            self._apply(migration, row)
+            done.append(migration.version)
+        return done
+
+    def _apply(self, migration: Migration, row: Optional[dict]):
+        """Применение одной миграции (или продолжение прерванной)"""
+        started = time.monotonic()
+        if row is None:
+            logger.info(f"Применение миграции {migration.version}: {migration.name}")
+            with self.engine.begin() as connection:
+                if migration.upgrade is not None:
+                    migration.upgrade(connection)
+                connection.execute(
+                    schema_migrations.insert().values(
+                        version=migration.version,
+                        name=migration.name,
+                        step=0,
+                        cursor=0,
+                        completed=not migration.backfills,
+                        applied_at=datetime.now(),
+                    )
+                )
+            step, cursor = 0, 0
+        else:
+            logger.info(
+                f"Продолжение миграции {migration.version}: {migration.name} "
+                f"(шаг {row['step']}, позиция {row['cursor']})"
+            )
+            step, cursor = row["step"], row["cursor"]
+
+        for index in range(step, len(migration.backfills)):
+            backfill = migration.backfills[index]
+            chunks = 0
+            while True:
+                with self.engine.begin() as connection:
+                    last_id = backfill.run_chunk(connection, cursor, self.chunk_size)
+                    if last_id is None:
+                        self._save_position(
+                            connection,
+                            migration,
+                            index + 1,
+                            0,
+                            completed=index + 1 == len(migration.backfills),
+                        )
+                    else:
+                        self._save_position(connection, migration, index, last_id)
+                if last_id is None:
+                    break
+                cursor = last_id
+                chunks += 1
+                if self.pause:
+                    time.sleep(self.pause)
+            logger.info(f"Заполнение {backfill.table} завершено, порций: {chunks}")
+            cursor = 0
+
+        logger.info(
+            f"Миграция {migration.version} применена "
+            f"за {time.monotonic() - started:.2f} с"
+        )
+
+    def _save_position(
+        self,
+        connection: Connection,
+        migration: Migration,
+        step: int,
+        cursor: int,
+        completed: bool = False,
+    ):
+        """Сохранение позиции заполнения в той же транзакции, что и порция"""
+        connection.execute(
+            schema_migrations.update()
+            .where(schema_migrations.c.version == migration.version)
+            .values(step=step, cursor=cursor, completed=completed)
+        )
+
+    def plan(self) -> List[dict]:
+        """
+        Оценка ожидающих миграций без их применения (dry run)
+
+        Returns:
+            List[dict]: Для каждой миграции: версия, название, оценка числа
+            строк и времени выполнения
+        """
+        applied = self.applied()
+        report = []
+        with self.engine.connect() as connection:
+            for migration in self.pending():
+                row = applied.get(migration.version)
+                rebuild_rows = sum(
+                    self._table_rows(connection, table) for table in migration.rebuilds
+                )
+                backfill_rows = 0
+                start_step = row["step"] if row else 0
+                for backfill in migration.backfills[start_step:]:
+                    try:
+                        backfill_rows += backfill.count(connection)
+                    except OperationalError:
+                        # Колонки ещё нет: верхняя оценка - вся таблица
+                        connection.rollback()
+                        backfill_rows += self._table_rows(connection, backfill.table)
+                chunks = -(-backfill_rows // self.chunk_size)
+                seconds = (
+                    rebuild_rows / Config.MIGRATION_INDEX_ROWS_PER_SECOND
+                    + backfill_rows / Config.MIGRATION_BACKFILL_ROWS_PER_SECOND
+                    + chunks * self.pause
+                )
+                report.append(
+                    {
+                        "version": migration.version,
+                        "name": migration.name,
+                        "resumed": row is not None,
+                        "rebuild_rows": rebuild_rows,
+                        "backfill_rows": backfill_rows,
+                        "chunks": chunks,
+                        "estimated_seconds": round(seconds, 2),
+                    }
+                )
+        return report
+
+    def _table_rows(self, connection: Connection, table: str) -> int:
+        """Количество строк в таблице (0, если таблицы нет)"""
+        if not inspect(connection).has_table(table):
+            return 0
+        return connection.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+def ensure_schema():
+    """
+    Проверка схемы при запуске приложения
+
+    Ожидающие миграции применяются только при Config.AUTO_MIGRATE: в
+    production миграции запускаются отдельно командой
+    python -m migrations.runner. Без них приложение не запускается, чтобы
+    не отвечать на /health, возвращая ошибки на запросах к задачам.
+
+    Raises:
+        SchemaOutdated: Если схема устарела и Config.AUTO_MIGRATE отключён
+    """
+    runner = MigrationRunner()
+    pending = runner.pending()
+    if not pending:
+        return
+    if Config.AUTO_MIGRATE:
+        runner.upgrade()
+        return
+    raise SchemaOutdated(
+        "Схема базы данных устарела (ожидающие миграции: "
+        f"{[m.version for m in pending]}): выполните python -m migrations.runner"
+    )
+
+
+def main():
+    """Точка входа командной строки"""
+    parser = argparse.ArgumentParser(description="Применение миграций схемы")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Только оценить ожидающие миграции"
+    )
+    parser.add_argument("--chunk-size", type=int, default=Config.MIGRATION_CHUNK_SIZE)
+    parser.add_argument("--pause", type=float, default=Config.MIGRATION_CHUNK_PAUSE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    runner = MigrationRunner(chunk_size=args.chunk_size, pause=args.pause)
+    print(f"Текущая версия схемы: {runner.current_version()}")
+
+    if args.dry_run:
+        plan = runner.plan()
+        if not plan:
+            print("Ожидающих миграций нет")
+        total = 0.0
+        for item in plan:
+            total += item["estimated_seconds"]
+            print(
+                f"{item['version']:>4} {item['name']:<24}"
+                f" строк (перестроение): {item['rebuild_rows']},"
+                f" строк (заполнение): {item['backfill_rows']},"
+                f" порций: {item['chunks']},"
+                f" ~{item['estimated_seconds']} с"
+                + (" (продолжение)" if item["resumed"] else "")
+            )
+        if plan:
+            print(f"Оценка общего времени: ~{total:.2f} с")
+        return
+
+    applied = runner.upgrade()
+    if applied:
+        print(f"Применены миграции: {applied}")
+    else:
+        print("Схема актуальна")
+
+
+if __name__ == "__main__":
+    main()
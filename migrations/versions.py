@@ -0,0 +1,90 @@
+"""
+Список версионированных миграций схемы базы данных.
+
+Новая миграция добавляется в конец списка MIGRATIONS со следующим номером
+версии. Шаги upgrade должны быть идемпотентными: базовая миграция создаёт
+актуальную схему моделей, поэтому на новой базе более поздние шаги
+находят уже существующие колонки и индексы.
+"""
+
+from sqlalchemy import inspect, text
+from database.db import Base, IdSequenceDB
+from migrations.runner import Backfill, Migration
+
+
+def has_column(connection, table: str, column: str) -> bool:
+    """Проверка наличия колонки в таблице"""
+    return column in {c["name"] for c in inspect(connection).get_columns(table)}
+
+
+def create_baseline(connection):
+    """Создание отсутствующих таблиц (существующие таблицы не изменяются)"""
+    Base.metadata.create_all(bind=connection)
+
+
+def create_todos_status_index(connection):
+    """Индекс для фильтрации и подсчёта задач по статусу"""
+    connection.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_todos_completed_updated_at "
+            "ON todos (completed, updated_at)"
+        )
+    )
+
+
+def add_completed_at(connection):
+    """Колонка времени выполнения задачи в основной и архивной таблицах"""
+    for table in ("todos", "todos_archive"):
+        if not has_column(connection, table, "completed_at"):
+            connection.execute(
+                text(f"ALTER TABLE {table} ADD COLUMN completed_at DATETIME")
+            )
+
+
+def create_todo_id_sequence(connection):
+    """
+    Счётчик ID задач выше максимального ID в основной и архивной таблицах
+
+    Без него SQLite выдаёт новый ID как max(id) + 1, и после удаления
+    последней задачи новая задача могла получить ID задачи, уже
+    перенесённой в архив. MAX(id) читается по первичному ключу, таблица
+    задач не перестраивается.
+    """
+    IdSequenceDB.__table__.create(bind=connection, checkfirst=True)
+    exists = connection.execute(
+        text("SELECT 1 FROM id_sequences WHERE name = 'todos'")
+    ).scalar()
+    if exists:
+        return
+    connection.execute(
+        text(
+            "INSERT INTO id_sequences (name, value) SELECT 'todos', "
+            "MAX(COALESCE((SELECT MAX(id) FROM todos), 0), "
+            "COALESCE((SELECT MAX(id) FROM todos_archive), 0))"
+        )
+    )
+
+
+MIGRATIONS = [
+    Migration(1, "baseline", upgrade=create_baseline),
+    Migration(
+        2,
+        "todos_status_index",
+        upgrade=create_todos_status_index,
+        rebuilds=["todos"],
+    ),
+    Migration(
+        3,
+        "todos_completed_at",
+        upgrade=add_completed_at,
+        backfills=[
+            Backfill(
+                table,
+                where="completed = 1 AND completed_at IS NULL",
+                assignments="completed_at = COALESCE(updated_at, created_at)",
+            )
+            for table in ("todos", "todos_archive")
+        ],
+    ),
+    Migration(4, "todo_id_sequence", upgrade=create_todo_id_sequence),
+]
@@ -32,10 +32,14 @@ class Todo:
         self.created_at = created_at or datetime.now()
         self.updated_at = updated_at
 
-    def to_dict(self) -> dict:
+    def to_dict(self, epoch_timestamps: bool = False) -> dict:
         """
         Преобразование объекта задачи в словарь
 
+        Args:
+            epoch_timestamps (bool): Передавать дату и время как целое число
+                секунд Unix вместо строки ISO 8601
+
         Returns:
             dict: Словарь с данными задачи
         """
@@ -44,8 +48,8 @@ class Todo:
             "title": self.title,
             "description": self.description,
             "completed": self.completed,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": _format_timestamp(self.created_at, epoch_timestamps),
+            "updated_at": _format_timestamp(self.updated_at, epoch_timestamps),
         }
 
     @classmethod
@@ -112,3 +116,12 @@ class Todo:
         if not isinstance(other, Todo):
             return False
         return self.id == other.id
+
+
+def _format_timestamp(value: Optional[datetime], epoch: bool):
+    """Форматирование даты и времени для словаря задачи"""
+    if value is None:
+        return None
+    if epoch:
+        return int(value.timestamp())
+    return value.isoformat()
@@ -0,0 +1,140 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+from models.todo import Todo
+
+
+class BaseTodoRepository(ABC):
+    """Интерфейс репозитория задач (общий для всех хранилищ)"""
+
+    @abstractmethod
+    def create(self, todo: Todo, commit: bool = True) -> Todo:
+        """
+        Создание новой задачи
+
+        Args:
+            todo (Todo): Объект задачи для создания
+            commit (bool): Зафиксировать транзакцию; при False задача только
+                записывается в транзакцию сессии запроса, которую фиксирует
+                вызывающий код (хранилище в памяти добавляет задачу при
+                фиксации этой сессии)
+
+        Returns:
+            Todo: Созданная задача
+        """
+
+    @abstractmethod
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """
+        Получение задачи по ID (включая архивные)
+
+        Args:
+            todo_id (int): Идентификатор задачи
+
+        Returns:
+            Optional[Todo]: Задача или None, если не найдена
+        """
+
+    @abstractmethod
+    def get_all(
+        self, skip: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[Todo]:
+        """
+        Получение всех задач с пагинацией (в порядке ID)
+
+        Args:
+            skip (int): Количество пропускаемых записей
+            limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
+
+        Returns:
+            List[Todo]: Список задач
+        """
+
+    @abstractmethod
+    def get_by_status(
+        self,
+        completed: bool,
+        skip: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+    ) -> List[Todo]:
+        """
+        Получение задач по статусу выполнения (в порядке ID)
+
+        Args:
+            completed (bool): Статус выполнения
+            skip (int): Количество пропускаемых записей
+            limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
+
+        Returns:
+            List[Todo]: Список задач
+        """
+
+    @abstractmethod
+    def update(
+        self,
+        todo_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        completed: Optional[bool] = None,
+    ) -> Optional[Todo]:
+        """
+        Обновление задачи (архивная задача возвращается в основное хранилище)
+
+        Args:
+            todo_id (int): Идентификатор задачи
+            title (Optional[str]): Новый заголовок
+            description (Optional[str]): Новое описание
+            completed (Optional[bool]): Новый статус выполнения
+
+        Returns:
+            Optional[Todo]: Обновленная задача или None, если не найдена
+        """
+
+    @abstractmethod
+    def delete(self, todo_id: int) -> bool:
+        """
+        Удаление задачи
+
+        Args:
+            todo_id (int): Идентификатор задачи
+
+        Returns:
+            bool: True, если задача была удалена, False если не найдена
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Получение общего количества задач (включая архивные)
+
+        Returns:
+            int: Общее количество задач
+        """
+
+    @abstractmethod
+    def count_by_status(self, completed: bool) -> int:
+        """
+        Получение количества задач по статусу (включая архивные)
+
+        Args:
+            completed (bool): Статус выполнения
+
+        Returns:
+            int: Количество задач с указанным статусом
+        """
+
+    @abstractmethod
+    def archive_completed_before(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Перенос одной порции задач, выполненных раньше cutoff, в архив
+
+        Args:
+            cutoff (datetime): Граница давности выполнения
+            batch_size (int): Максимальное количество задач в порции
+
+        Returns:
+            int: Количество перенесённых задач
+        """
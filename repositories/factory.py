@@ -0,0 +1,47 @@
+import threading
+from typing import Optional
+from sqlalchemy.orm import Session
+from config import Config
+from repositories.base import BaseTodoRepository
+from repositories.memory_repository import InMemoryTodoRepository
+from repositories.todo_repository import TodoRepository
+
+_memory_repository: Optional[InMemoryTodoRepository] = None
+_memory_lock = threading.Lock()
+
+
+def get_memory_repository() -> InMemoryTodoRepository:
+    """
+    Получение общего для процесса хранилища задач в памяти
+
+    Returns:
+        InMemoryTodoRepository: Репозиторий задач в памяти
+    """
+    global _memory_repository
+    with _memory_lock:
+        if _memory_repository is None:
+            _memory_repository = InMemoryTodoRepository(
+                snapshot_path=Config.MEMORY_SNAPSHOT_PATH
+            )
+        return _memory_repository
+
+
+def create_todo_repository(db: Optional[Session] = None) -> BaseTodoRepository:
+    """
+    Создание репозитория задач для хранилища, выбранного в Config
+
+    Args:
+        db (Optional[Session]): Сессия базы данных для хранилища SQLite
+            (по умолчанию - сессия текущего запроса)
+
+    Returns:
+        BaseTodoRepository: Репозиторий задач
+
+    Raises:
+        ValueError: Если хранилище в Config неизвестно
+    """
+    if Config.REPOSITORY_BACKEND == "sqlite":
+        return TodoRepository(db)
+    if Config.REPOSITORY_BACKEND == "memory":
+        return get_memory_repository()
+    raise ValueError(f"Неизвестное хранилище задач: {Config.REPOSITORY_BACKEND}")
@@ -0,0 +1,216 @@
+import json
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+from database.db import IdempotencyKeyDB, RequestSessionMixin
+from datetime import datetime
+
+
+class IdempotencyRecord:
+    """Запись хранилища ключей идемпотентности"""
+
+    def __init__(
+        self,
+        key: str,
+        fingerprint: str,
+        status_code: Optional[int],
+        response_body: Optional[dict],
+        created_at: datetime,
+        expires_at: datetime,
+    ):
+        """
+        Инициализация записи
+
+        Args:
+            key (str): Ключ идемпотентности
+            fingerprint (str): Отпечаток запроса
+            status_code (Optional[int]): Код ответа или None, если запрос выполняется
+            response_body (Optional[dict]): Тело ответа
+            created_at (datetime): Время резервирования ключа
+            expires_at (datetime): Время истечения записи
+        """
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.response_body = response_body
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+    @property
+    def completed(self) -> bool:
+        """Сохранён ли ответ для ключа"""
+        return self.status_code is not None
+
+
+class IdempotencyRepository(RequestSessionMixin):
+    """Репозиторий сохранённых ответов для ключей идемпотентности"""
+
+    def reserve(
+        self,
+        key: str,
+        fingerprint: str,
+        expires_at: datetime,
+        stale_before: datetime,
+    ) -> Optional[IdempotencyRecord]:
+        """
+        Резервирование ключа для выполнения запроса
+
+        Истёкшие записи и незавершённые резервирования, созданные раньше
+        stale_before (например, после падения процесса), перезанимаются.
+
+        Args:
+            key (str): Ключ идемпотентности
+            fingerprint (str): Отпечаток запроса
+            expires_at (datetime): Время истечения записи
+            stale_before (datetime): Граница устаревания незавершённого резервирования
+
+        Returns:
+            Optional[IdempotencyRecord]: None, если ключ зарезервирован этим
+            вызовом, иначе существующая запись
+        """
+        now = datetime.now()
+        # Повторы и опросы находят запись чтением, не занимая блокировку записи
+        record = self.get(key)
+        if record is None:
+            self.db.add(
+                IdempotencyKeyDB(
+                    key=key,
+                    fingerprint=fingerprint,
+                    created_at=now,
+                    expires_at=expires_at,
+                )
+            )
+            try:
+                self.db.commit()
+                return None
+            except IntegrityError:
+                self.db.rollback()
+
+            record = self.get(key)
+            if record is None:
+                # Запись удалили между вставкой и чтением, пробуем ещё раз
+                return self.reserve(key, fingerprint, expires_at, stale_before)
+
+        expired = record.expires_at <= now
+        abandoned = not record.completed and record.created_at < stale_before
+        if expired or abandoned:
+            taken = (
+                self.db.query(IdempotencyKeyDB)
+                .filter(
+                    IdempotencyKeyDB.key == key,
+                    IdempotencyKeyDB.created_at == record.created_at,
+                )
+                .update(
+                    {
+                        IdempotencyKeyDB.fingerprint: fingerprint,
+                        IdempotencyKeyDB.status_code: None,
+                        IdempotencyKeyDB.response_body: None,
+                        IdempotencyKeyDB.created_at: now,
+                        IdempotencyKeyDB.expires_at: expires_at,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            self.db.commit()
+            if taken:
+                return None
+            return self.get(key)
+
+        return record
+
+    def get(self, key: str) -> Optional[IdempotencyRecord]:
+        """
+        Получение записи по ключу
+
+        Args:
+            key (str): Ключ идемпотентности
+
+        Returns:
+            Optional[IdempotencyRecord]: Запись или None, если не найдена
+        """
+        db_record = (
+            self.db.query(IdempotencyKeyDB)
+            .filter(IdempotencyKeyDB.key == key)
+            .populate_existing()
+            .first()
+        )
+        # Завершаем транзакцию чтения, чтобы следующий опрос видел новые данные
+        self.db.commit()
+        if db_record:
+            return self._to_record(db_record)
+        return None
+
+    def complete(self, key: str, status_code: int, response_body: dict):
+        """
+        Сохранение ответа для зарезервированного ключа
+
+        Фиксирует транзакцию сессии вместе с незафиксированными изменениями
+        обработчика запроса.
+
+        Args:
+            key (str): Ключ идемпотентности
+            status_code (int): Код ответа
+            response_body (dict): Тело ответа
+        """
+        self.db.query(IdempotencyKeyDB).filter(IdempotencyKeyDB.key == key).update(
+            {
+                IdempotencyKeyDB.status_code: status_code,
+                IdempotencyKeyDB.response_body: json.dumps(
+                    response_body, ensure_ascii=False, separators=(",", ":")
+                ),
+            },
+            synchronize_session=False,
+        )
+        self.db.commit()
+
+    def release(self, key: str):
+        """
+        Снятие незавершённого резервирования (запрос завершился ошибкой)
+
+        Args:
+            key (str): Ключ идемпотентности
+        """
+        # Транзакция могла остаться прерванной ошибкой обработчика
+        self.db.rollback()
+        self.db.query(IdempotencyKeyDB).filter(
+            IdempotencyKeyDB.key == key, IdempotencyKeyDB.status_code.is_(None)
+        ).delete(synchronize_session=False)
+        self.db.commit()
+
+    def purge_expired(self, limit: int = 500) -> int:
+        """
+        Удаление истёкших записей небольшими порциями
+
+        Args:
+            limit (int): Максимальное количество удаляемых записей
+
+        Returns:
+            int: Количество удалённых записей
+        """
+        expired_keys = (
+            self.db.query(IdempotencyKeyDB.key)
+            .filter(IdempotencyKeyDB.expires_at <= datetime.now())
+            .limit(limit)
+            .subquery()
+        )
+        deleted = (
+            self.db.query(IdempotencyKeyDB)
+            .filter(IdempotencyKeyDB.key.in_(expired_keys.select()))
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return deleted
+
+    def _to_record(self, db_record: IdempotencyKeyDB) -> IdempotencyRecord:
+        """Преобразование строки базы данных в запись"""
+        return IdempotencyRecord(
+            key=db_record.key,
+            fingerprint=db_record.fingerprint,
+            status_code=db_record.status_code,
+            response_body=(
+                json.loads(db_record.response_body)
+                if db_record.response_body is not None
+                else None
+            ),
+            created_at=db_record.created_at,
+            expires_at=db_record.expires_at,
+        )
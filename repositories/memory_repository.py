@@ -0,0 +1,428 @@
+import heapq
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import event
+from database.db import current_session
+from models.todo import Todo
+from repositories.base import BaseTodoRepository
+
+# Ключ Session.info со списком задач, ожидающих фиксации сессии
+_PENDING_KEY = "memory_pending_todos"
+
+
+class _Record:
+    """Компактная запись задачи в памяти"""
+
+    __slots__ = (
+        "id",
+        "title",
+        "description",
+        "completed",
+        "created_at",
+        "updated_at",
+        "completed_at",
+        "archived",
+    )
+
+    def __init__(
+        self,
+        id: int,
+        title: str,
+        description: Optional[str],
+        completed: bool,
+        created_at: Optional[datetime],
+        updated_at: Optional[datetime],
+        completed_at: Optional[datetime] = None,
+        archived: bool = False,
+    ):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.completed = completed
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.completed_at = completed_at
+        self.archived = archived
+
+    def to_todo(self) -> Todo:
+        """Создание копии задачи для возврата из репозитория"""
+        return Todo(
+            id=self.id,
+            title=self.title,
+            description=self.description,
+            completed=self.completed,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+    def completion_key(self) -> Tuple[datetime, int]:
+        """Ключ индекса по времени выполнения (как coalesce в SQL-хранилище)"""
+        return (self.completed_at or self.updated_at or self.created_at, self.id)
+
+
+class InMemoryTodoRepository(BaseTodoRepository):
+    """
+    Репозиторий задач в памяти процесса.
+
+    Задачи хранятся в словаре в порядке ID. Вторичные индексы: отсортированные
+    списки ID по статусу выполнения (основное хранилище), список архивных ID
+    и индекс выполненных задач по времени выполнения/изменения для архивации.
+    Счётчики для статистики поддерживаются за O(1). Хранилище общее для
+    процесса, поэтому экземпляр создаётся один раз (см. repositories.factory).
+    """
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        """
+        Инициализация репозитория
+
+        Args:
+            snapshot_path (Optional[str]): Файл снимка; если существует,
+                данные загружаются из него
+        """
+        self.snapshot_path = snapshot_path
+        self._lock = threading.RLock()
+        self._records: Dict[int, _Record] = {}
+        self._hot_by_status: Dict[bool, List[int]] = {True: [], False: []}
+        self._archived: List[int] = []
+        self._by_completion: List[Tuple[datetime, int]] = []
+        self._counts: Dict[bool, int] = {True: 0, False: 0}
+        self._next_id = 1
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.load_snapshot()
+
+    def create(self, todo: Todo, commit: bool = True) -> Todo:
+        """
+        Создание новой задачи
+
+        Args:
+            todo (Todo): Объект задачи для создания
+            commit (bool): Добавить задачу сразу (False - при фиксации
+                сессии текущего запроса, при откате задача отбрасывается)
+
+        Returns:
+            Todo: Созданная задача
+        """
+        now = datetime.now()
+        with self._lock:
+            record = _Record(
+                id=self._next_id,
+                title=todo.title,
+                description=todo.description,
+                completed=todo.completed,
+                created_at=todo.created_at or now,
+                updated_at=todo.updated_at or now,
+            )
+            self._next_id += 1
+            if commit:
+                self._insert(record)
+        if not commit:
+            self._defer(record)
+        return record.to_todo()
+
+    def _defer(self, record: _Record):
+        """
+        Отложенное добавление задачи до фиксации сессии текущего запроса
+
+        Хранилище без транзакций: так задача становится видна вместе
+        с изменениями, которые вызывающий код фиксирует в базе (например,
+        с сохранённым ответом ключа идемпотентности).
+
+        Args:
+            record (_Record): Запись задачи
+        """
+        session = current_session()
+        pending = session.info.get(_PENDING_KEY)
+        if pending is None:
+            pending = session.info[_PENDING_KEY] = []
+            event.listen(session, "after_commit", self._apply_pending)
+            event.listen(session, "after_transaction_end", self._discard_pending)
+        # Задача привязывается к транзакции сессии, даже если вызывающий код
+        # ещё ничего не записал в базу: иначе откат без транзакции не
+        # отбросил бы её, а следующая фиксация добавила бы
+        if not session.in_transaction():
+            session.begin()
+        pending.append(record)
+
+    def _apply_pending(self, session):
+        """Добавление задач, ожидавших фиксации сессии"""
+        pending = session.info[_PENDING_KEY]
+        with self._lock:
+            for record in pending:
+                self._insert(record)
+        pending.clear()
+
+    def _discard_pending(self, session, transaction):
+        """Отбрасывание задач, если транзакция завершилась без фиксации"""
+        if transaction.parent is None:
+            session.info[_PENDING_KEY].clear()
+
+    def get_by_id(self, todo_id: int) -> Optional[Todo]:
+        """
+        Получение задачи по ID
+
+        Args:
+            todo_id (int): Идентификатор задачи
+
+        Returns:
+            Optional[Todo]: Задача или None, если не найдена
+        """
+        with self._lock:
+            record = self._records.get(todo_id)
+            return record.to_todo() if record else None
+
+    def get_all(
+        self, skip: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[Todo]:
+        """
+        Получение всех задач с пагинацией
+
+        Args:
+            skip (int): Количество пропускаемых записей
+            limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
+
+        Returns:
+            List[Todo]: Список задач
+        """
+        with self._lock:
+            if include_archived:
+                # Словарь хранит задачи в порядке ID
+                records = islice(self._records.values(), skip, skip + limit)
+                return [record.to_todo() for record in records]
+            ids = heapq.merge(self._hot_by_status[False], self._hot_by_status[True])
+            return self._page(ids, skip, limit)
+
+    def get_by_status(
+        self,
+        completed: bool,
+        skip: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+    ) -> List[Todo]:
+        """
+        Получение задач по статусу выполнения
+
+        Args:
+            completed (bool): Статус выполнения
+            skip (int): Количество пропускаемых записей
+            limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
+
+        Returns:
+            List[Todo]: Список задач
+        """
+        with self._lock:
+            hot = self._hot_by_status[completed]
+            if include_archived and completed:
+                # В архиве только выполненные задачи
+                return self._page(heapq.merge(hot, self._archived), skip, limit)
+            return [self._records[i].to_todo() for i in hot[skip : skip + limit]]
+
+    def update(
+        self,
+        todo_id: int,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        completed: Optional[bool] = None,
+    ) -> Optional[Todo]:
+        """
+        Обновление задачи
+
+        Args:
+            todo_id (int): Идентификатор задачи
+            title (Optional[str]): Новый заголовок
+            description (Optional[str]): Новое описание
+            completed (Optional[bool]): Новый статус выполнения
+
+        Returns:
+            Optional[Todo]: Обновленная задача или None, если не найдена
+        """
+        with self._lock:
+            record = self._records.get(todo_id)
+            if record is None:
+                return None
+
+            self._unindex(record)
+            record.archived = False
+            if title is not None:
+                record.title = title
+            if description is not None:
+                record.description = description
+            if completed is not None:
+                if completed and not record.completed:
+                    record.completed_at = datetime.now()
+                elif not completed:
+                    record.completed_at = None
+                record.completed = completed
+            record.updated_at = datetime.now()
+            self._index(record)
+            return record.to_todo()
+
+    def delete(self, todo_id: int) -> bool:
+        """
+        Удаление задачи
+
+        Args:
+            todo_id (int): Идентификатор задачи
+
+        Returns:
+            bool: True, если задача была удалена, False если не найдена
+        """
+        with self._lock:
+            record = self._records.pop(todo_id, None)
+            if record is None:
+                return False
+            self._unindex(record)
+            return True
+
+    def count(self) -> int:
+        """
+        Получение общего количества задач (включая архивные)
+
+        Returns:
+            int: Общее количество задач
+        """
+        with self._lock:
+            return self._counts[True] + self._counts[False]
+
+    def count_by_status(self, completed: bool) -> int:
+        """
+        Получение количества задач по статусу (включая архивные)
+
+        Args:
+            completed (bool): Статус выполнения
+
+        Returns:
+            int: Количество задач с указанным статусом
+        """
+        with self._lock:
+            return self._counts[completed]
+
+    def archive_completed_before(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Перенос одной порции выполненных задач в архив
+
+        Args:
+            cutoff (datetime): Граница давности выполнения
+            batch_size (int): Максимальное количество задач в порции
+
+        Returns:
+            int: Количество перенесённых задач
+        """
+        with self._lock:
+            due = [
+                todo_id
+                for completed_at, todo_id in self._by_completion[:batch_size]
+                if completed_at < cutoff
+            ]
+            for todo_id in due:
+                record = self._records[todo_id]
+                self._unindex(record)
+                record.archived = True
+                self._index(record)
+            return len(due)
+
+    def snapshot(self):
+        """Сохранение снимка данных в файл (атомарная замена)"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = {
+                "next_id": self._next_id,
+                "todos": [
+                    [
+                        r.id,
+                        r.title,
+                        r.description,
+                        r.completed,
+                        _dump_datetime(r.created_at),
+                        _dump_datetime(r.updated_at),
+                        _dump_datetime(r.completed_at),
+                        r.archived,
+                    ]
+                    for r in self._records.values()
+                ],
+            }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.snapshot_path)
+
+    def load_snapshot(self):
+        """Загрузка данных из файла снимка"""
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            data = json.load(f)
+        with self._lock:
+            for row in data["todos"]:
+                self._insert(
+                    _Record(
+                        id=row[0],
+                        title=row[1],
+                        description=row[2],
+                        completed=row[3],
+                        created_at=_load_datetime(row[4]),
+                        updated_at=_load_datetime(row[5]),
+                        completed_at=_load_datetime(row[6]),
+                        archived=row[7],
+                    )
+                )
+            self._next_id = max(self._next_id, data["next_id"])
+
+    def _insert(self, record: _Record):
+        """Добавление записи и её индексов"""
+        self._records[record.id] = record
+        self._index(record)
+
+    def _index(self, record: _Record):
+        """Добавление записи в индексы и счётчики"""
+        self._counts[record.completed] += 1
+        if record.archived:
+            insort(self._archived, record.id)
+            return
+        _insert_sorted(self._hot_by_status[record.completed], record.id)
+        if record.completed:
+            insort(self._by_completion, record.completion_key())
+
+    def _unindex(self, record: _Record):
+        """Удаление записи из индексов и счётчиков"""
+        self._counts[record.completed] -= 1
+        if record.archived:
+            _remove_sorted(self._archived, record.id)
+            return
+        _remove_sorted(self._hot_by_status[record.completed], record.id)
+        if record.completed:
+            _remove_sorted(self._by_completion, record.completion_key())
+
+    def _page(self, ids: Iterable[int], skip: int, limit: int) -> List[Todo]:
+        """Страница задач по упорядоченной последовательности ID"""
+        return [self._records[i].to_todo() for i in islice(ids, skip, skip + limit)]
+
+
+def _insert_sorted(values: list, value):
+    """Вставка в отсортированный список (новые ID добавляются в конец за O(1))"""
+    if not values or values[-1] < value:
+        values.append(value)
+    else:
+        insort(values, value)
+
+
+def _remove_sorted(values: list, value):
+    """Удаление значения из отсортированного списка"""
+    index = bisect_left(values, value)
+    if index < len(values) and values[index] == value:
+        del values[index]
+
+
+def _dump_datetime(value: Optional[datetime]) -> Optional[str]:
+    """Дата и время для снимка"""
+    return value.isoformat() if value else None
+
+
+def _load_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Дата и время из снимка"""
+    return datetime.fromisoformat(value) if value else None
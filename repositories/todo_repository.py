@@ -1,34 +1,28 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database.db import TodoDB
+from sqlalchemy import DateTime, func, insert, literal, select, union_all, update
+from database.db import IdSequenceDB, RequestSessionMixin, TodoDB, TodoArchiveDB
 from models.todo import Todo
+from repositories.base import BaseTodoRepository
 from datetime import datetime
 
 
-class TodoRepository:
+class TodoRepository(RequestSessionMixin, BaseTodoRepository):
     """Репозиторий для работы с задачами в базе данных"""
 
-    def __init__(self, db: Session):
-        """
-        Инициализация репозитория
-
-        Args:
-            db (Session): Сессия базы данных
-        """
-        self.db = db
-
-    def create(self, todo: Todo) -> Todo:
+    def create(self, todo: Todo, commit: bool = True) -> Todo:
         """
         Создание новой задачи
 
         Args:
             todo (Todo): Объект задачи для создания
+            commit (bool): Зафиксировать транзакцию (при False задача только
+                записывается в текущую транзакцию сессии)
 
         Returns:
             Todo: Созданная задача
         """
         db_todo = TodoDB(
+            id=self._allocate_id(),
             title=todo.title,
             description=todo.description,
             completed=todo.completed,
@@ -37,7 +31,10 @@ class TodoRepository:
         )
 
         self.db.add(db_todo)
-        self.db.commit()
+        if commit:
+            self.db.commit()
+        else:
+            self.db.flush()
         self.db.refresh(db_todo)
 
         # Преобразуем обратно в модель Todo
@@ -61,6 +58,11 @@ class TodoRepository:
             Optional[Todo]: Задача или None, если не найдена
         """
         db_todo = self.db.query(TodoDB).filter(TodoDB.id == todo_id).first()
+        if db_todo is None:
+            # Задача могла быть перенесена в архив
+            db_todo = (
+                self.db.query(TodoArchiveDB).filter(TodoArchiveDB.id == todo_id).first()
+            )
         if db_todo:
             return Todo(
                 id=db_todo.id,
@@ -72,18 +74,26 @@ class TodoRepository:
             )
         return None
 
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Todo]:
+    def get_all(
+        self, skip: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[Todo]:
         """
         Получение всех задач с пагинацией
 
         Args:
             skip (int): Количество пропускаемых записей
             limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
 
         Returns:
             List[Todo]: Список задач
         """
-        db_todos = self.db.query(TodoDB).offset(skip).limit(limit).all()
+        if include_archived:
+            return self._get_both_tiers(None, skip, limit)
+
+        db_todos = (
+            self.db.query(TodoDB).order_by(TodoDB.id).offset(skip).limit(limit).all()
+        )
         return [
             Todo(
                 id=db_todo.id,
@@ -97,7 +107,11 @@ class TodoRepository:
         ]
 
     def get_by_status(
-        self, completed: bool, skip: int = 0, limit: int = 100
+        self,
+        completed: bool,
+        skip: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
     ) -> List[Todo]:
         """
         Получение задач по статусу выполнения
@@ -106,13 +120,18 @@ class TodoRepository:
             completed (bool): Статус выполнения
             skip (int): Количество пропускаемых записей
             limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
 
         Returns:
             List[Todo]: Список задач
         """
+        if include_archived:
+            return self._get_both_tiers(completed, skip, limit)
+
         db_todos = (
             self.db.query(TodoDB)
             .filter(TodoDB.completed == completed)
+            .order_by(TodoDB.id)
             .offset(skip)
             .limit(limit)
             .all()
@@ -129,6 +148,50 @@ class TodoRepository:
             for db_todo in db_todos
         ]
 
+    def _get_both_tiers(
+        self, completed: Optional[bool], skip: int, limit: int
+    ) -> List[Todo]:
+        """
+        Получение задач из основной и архивной таблиц с общей пагинацией
+
+        Args:
+            completed (Optional[bool]): Фильтр по статусу выполнения
+            skip (int): Количество пропускаемых записей
+            limit (int): Максимальное количество записей
+
+        Returns:
+            List[Todo]: Список задач, упорядоченный по ID
+        """
+        tiers = []
+        for table in (TodoDB, TodoArchiveDB):
+            query = select(
+                table.id,
+                table.title,
+                table.description,
+                table.completed,
+                table.created_at,
+                table.updated_at,
+            )
+            if completed is not None:
+                query = query.where(table.completed == completed)
+            tiers.append(query)
+
+        combined = union_all(*tiers).subquery()
+        rows = self.db.execute(
+            select(combined).order_by(combined.c.id).offset(skip).limit(limit)
+        ).all()
+        return [
+            Todo(
+                id=row.id,
+                title=row.title,
+                description=row.description,
+                completed=row.completed,
+                created_at=row.created_at,
+                updated_at=row.updated_at,
+            )
+            for row in rows
+        ]
+
     def update(
         self,
         todo_id: int,
@@ -149,6 +212,9 @@ class TodoRepository:
             Optional[Todo]: Обновленная задача или None, если не найдена
         """
         db_todo = self.db.query(TodoDB).filter(TodoDB.id == todo_id).first()
+        if not db_todo:
+            # Изменяемая архивная задача возвращается в основную таблицу
+            db_todo = self._restore(todo_id)
         if not db_todo:
             return None
 
@@ -157,6 +223,10 @@ class TodoRepository:
         if description is not None:
             db_todo.description = description
         if completed is not None:
+            if completed and not db_todo.completed:
+                db_todo.completed_at = datetime.now()
+            elif not completed:
+                db_todo.completed_at = None
             db_todo.completed = completed
 
         db_todo.updated_at = datetime.now()
@@ -183,6 +253,10 @@ class TodoRepository:
             bool: True, если задача была удалена, False если не найдена
         """
         db_todo = self.db.query(TodoDB).filter(TodoDB.id == todo_id).first()
+        if db_todo is None:
+            db_todo = (
+                self.db.query(TodoArchiveDB).filter(TodoArchiveDB.id == todo_id).first()
+            )
         if db_todo:
             self.db.delete(db_todo)
             self.db.commit()
@@ -191,16 +265,19 @@ class TodoRepository:
 
     def count(self) -> int:
         """
-        Получение общего количества задач
+        Получение общего количества задач (включая архивные)
 
         Returns:
             int: Общее количество задач
         """
-        return self.db.query(func.count(TodoDB.id)).scalar()
+        return (
+            self.db.query(func.count(TodoDB.id)).scalar()
+            + self.db.query(func.count(TodoArchiveDB.id)).scalar()
+        )
 
     def count_by_status(self, completed: bool) -> int:
         """
-        Получение количества задач по статусу
+        Получение количества задач по статусу (включая архивные)
 
         Args:
             completed (bool): Статус выполнения
@@ -208,8 +285,115 @@ class TodoRepository:
         Returns:
             int: Количество задач с указанным статусом
         """
-        return (
-            self.db.query(func.count(TodoDB.id))
-            .filter(TodoDB.completed == completed)
+        return sum(
+            self.db.query(func.count(table.id))
+            .filter(table.completed == completed)
             .scalar()
+            for table in (TodoDB, TodoArchiveDB)
+        )
+
+    def archive_completed_before(self, cutoff: datetime, batch_size: int) -> int:
+        """
+        Перенос одной порции выполненных задач в архивную таблицу
+
+        Переносятся задачи, выполненные раньше cutoff (для задач без
+        completed_at используется время последнего изменения).
+
+        Args:
+            cutoff (datetime): Граница давности выполнения
+            batch_size (int): Максимальное количество задач в порции
+
+        Returns:
+            int: Количество перенесённых задач
+        """
+        completed_at = func.coalesce(
+            TodoDB.completed_at, TodoDB.updated_at, TodoDB.created_at
+        )
+        due = (TodoDB.completed.is_(True), completed_at < cutoff)
+        ids = [
+            row.id
+            for row in self.db.query(TodoDB.id)
+            .filter(*due)
+            .order_by(TodoDB.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            return 0
+
+        columns = [
+            "id",
+            "title",
+            "description",
+            "completed",
+            "created_at",
+            "updated_at",
+            "completed_at",
+        ]
+        # Чтение ID не открывает транзакцию: задачу могли изменить после него,
+        # поэтому условие проверяется повторно. INSERT берёт блокировку записи,
+        # и DELETE в той же транзакции видит тот же набор строк
+        self.db.execute(
+            insert(TodoArchiveDB).from_select(
+                columns + ["archived_at"],
+                select(
+                    *(getattr(TodoDB, name) for name in columns),
+                    literal(datetime.now(), DateTime()),
+                ).where(TodoDB.id.in_(ids), *due),
+            )
+        )
+        moved = (
+            self.db.query(TodoDB)
+            .filter(TodoDB.id.in_(ids), *due)
+            .delete(synchronize_session=False)
+        )
+        self.db.commit()
+        return moved
+
+    def _allocate_id(self) -> int:
+        """
+        Выдача ID новой задачи из счётчика id_sequences
+
+        Счётчик увеличивается в транзакции вставки задачи (UPDATE берёт
+        блокировку записи), поэтому одновременные вставки получают разные ID.
+
+        Returns:
+            int: Новый ID задачи
+        """
+        self.db.execute(
+            update(IdSequenceDB)
+            .where(IdSequenceDB.name == "todos")
+            .values(value=IdSequenceDB.value + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return self.db.execute(
+            select(IdSequenceDB.value).where(IdSequenceDB.name == "todos")
+        ).scalar_one()
+
+    def _restore(self, todo_id: int) -> Optional[TodoDB]:
+        """
+        Возврат архивной задачи в основную таблицу (без фиксации транзакции)
+
+        Args:
+            todo_id (int): Идентификатор задачи
+
+        Returns:
+            Optional[TodoDB]: Восстановленная задача или None, если не найдена
+        """
+        archived = (
+            self.db.query(TodoArchiveDB).filter(TodoArchiveDB.id == todo_id).first()
         )
+        if archived is None:
+            return None
+
+        db_todo = TodoDB(
+            id=archived.id,
+            title=archived.title,
+            description=archived.description,
+            completed=archived.completed,
+            created_at=archived.created_at,
+            updated_at=archived.updated_at,
+            completed_at=archived.completed_at,
+        )
+        self.db.delete(archived)
+        self.db.add(db_todo)
+        return db_todo
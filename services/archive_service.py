@@ -0,0 +1,99 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from config import Config
+from database.db import SessionLocal
+from repositories.factory import create_todo_repository
+from services.todo_service import read_flight
+
+logger = logging.getLogger(__name__)
+
+
+class TodoArchiver:
+    """
+    Фоновый перенос давно выполненных задач в архивную таблицу.
+
+    Задачи переносятся небольшими порциями, каждая в своей транзакции,
+    поэтому блокировка записи удерживается недолго.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        after_days: int = Config.ARCHIVE_AFTER_DAYS,
+        batch_size: int = Config.ARCHIVE_BATCH_SIZE,
+        interval: float = Config.ARCHIVE_INTERVAL_SECONDS,
+        batch_pause: float = Config.ARCHIVE_BATCH_PAUSE,
+    ):
+        """
+        Инициализация архиватора
+
+        Args:
+            session_factory (Callable[[], Session]): Фабрика сессий базы данных
+            after_days (int): Через сколько дней после выполнения задача архивируется
+            batch_size (int): Количество задач в одной порции
+            interval (float): Интервал между запусками, секунды
+            batch_pause (float): Пауза между порциями, секунды
+        """
+        self.session_factory = session_factory
+        self.after_days = after_days
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch_pause = batch_pause
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """
+        Архивация всех подходящих задач порциями
+
+        Returns:
+            int: Количество перенесённых задач
+        """
+        cutoff = datetime.now() - timedelta(days=self.after_days)
+        total = 0
+        db = self.session_factory()
+        try:
+            repository = create_todo_repository(db)
+            while not self._stop.is_set():
+                moved = repository.archive_completed_before(cutoff, self.batch_size)
+                if moved:
+                    total += moved
+                    read_flight.invalidate()
+                if moved < self.batch_size:
+                    break
+                self._stop.wait(self.batch_pause)
+        finally:
+            db.close()
+
+        if total:
+            logger.info(f"Перенесено в архив задач: {total}")
+        return total
+
+    def start(self):
+        """Запуск фонового потока архивации"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="todo-archiver", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Остановка фонового потока архивации"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Цикл фонового потока"""
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Ошибка при архивации задач: {e}")
+            self._stop.wait(self.interval)
@@ -0,0 +1,149 @@
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from config import Config
+from repositories.idempotency_repository import IdempotencyRepository
+
+
+class IdempotencyKeyMismatch(Exception):
+    """Ключ идемпотентности повторно использован с другим телом запроса"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """Первый запрос с этим ключом не завершился за время ожидания"""
+
+
+# Ключи, выполняющиеся в этом процессе: ожидающие просыпаются без опроса БД
+_local_lock = threading.Lock()
+_local_inflight: Dict[str, threading.Event] = {}
+_reservations = 0
+
+
+def request_fingerprint(method: str, path: str, payload) -> str:
+    """
+    Вычисление отпечатка запроса
+
+    Args:
+        method (str): HTTP-метод
+        path (str): Путь запроса
+        payload: Тело запроса
+
+    Returns:
+        str: SHA-256 отпечаток запроса
+    """
+    canonical = json.dumps(
+        [method, path, payload], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyService:
+    """Сервис выполнения запросов с ключом идемпотентности"""
+
+    # Интервал опроса БД, когда первый запрос выполняется в другом процессе
+    POLL_INTERVAL = 0.02
+
+    def __init__(self, db: Optional[Session] = None):
+        """
+        Инициализация сервиса
+
+        Args:
+            db (Optional[Session]): Сессия базы данных (по умолчанию - сессия
+                текущего запроса)
+        """
+        self.repository = IdempotencyRepository(db)
+
+    def execute(
+        self, key: str, fingerprint: str, handler: Callable[[], Tuple[int, dict]]
+    ) -> Tuple[int, dict, bool]:
+        """
+        Выполнение запроса не более одного раза для ключа
+
+        Повтор с тем же ключом получает сохранённый ответ без повторного
+        выполнения. Одновременный запрос с тем же ключом ждёт завершения
+        первого. Обработчик пишет в сессию запроса без фиксации: его
+        изменения фиксируются одной транзакцией вместе с сохранённым
+        ответом, поэтому при падении процесса между ними повтор не создаст
+        дубликат. Если обработчик или сохранение ответа завершились
+        исключением, изменения откатываются, резервирование снимается
+        и запрос можно повторить.
+
+        Args:
+            key (str): Ключ идемпотентности
+            fingerprint (str): Отпечаток запроса
+            handler (Callable[[], Tuple[int, dict]]): Обработчик, возвращающий
+                код и тело ответа
+
+        Returns:
+            Tuple[int, dict, bool]: Код ответа, тело ответа и признак повтора
+
+        Raises:
+            IdempotencyKeyMismatch: Если ключ использован с другим запросом
+            IdempotencyKeyInProgress: Если первый запрос не завершился вовремя
+        """
+        self._maybe_purge()
+        deadline = time.monotonic() + Config.IDEMPOTENCY_WAIT_TIMEOUT
+
+        while True:
+            now = datetime.now()
+            record = self.repository.reserve(
+                key,
+                fingerprint,
+                expires_at=now + timedelta(seconds=Config.IDEMPOTENCY_TTL_SECONDS),
+                stale_before=now - timedelta(seconds=Config.IDEMPOTENCY_LOCK_TIMEOUT),
+            )
+            if record is None:
+                return self._run(key, handler)
+
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyMismatch(
+                    "Ключ идемпотентности уже использован с другим запросом"
+                )
+            if record.completed:
+                return record.status_code, record.response_body, True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise IdempotencyKeyInProgress(
+                    "Запрос с этим ключом идемпотентности ещё выполняется"
+                )
+            with _local_lock:
+                event = _local_inflight.get(key)
+            if event is not None:
+                event.wait(remaining)
+            else:
+                time.sleep(min(self.POLL_INTERVAL, remaining))
+
+    def _run(
+        self, key: str, handler: Callable[[], Tuple[int, dict]]
+    ) -> Tuple[int, dict, bool]:
+        """Выполнение обработчика для зарезервированного ключа"""
+        event = threading.Event()
+        with _local_lock:
+            _local_inflight[key] = event
+        try:
+            try:
+                status_code, body = handler()
+                self.repository.complete(key, status_code, body)
+            except BaseException:
+                self.repository.release(key)
+                raise
+            return status_code, body, False
+        finally:
+            with _local_lock:
+                if _local_inflight.get(key) is event:
+                    del _local_inflight[key]
+            event.set()
+
+    def _maybe_purge(self):
+        """Периодическое удаление истёкших записей"""
+        global _reservations
+        with _local_lock:
+            _reservations += 1
+            due = _reservations % Config.IDEMPOTENCY_PURGE_EVERY == 0
+        if due:
+            self.repository.purge_expired()
@@ -0,0 +1,99 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class _Call:
+    """Выполняющийся (in-flight) запрос и его результат"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Объединение (coalescing) одинаковых одновременных чтений.
+
+    Первый вызов с данным ключом выполняет функцию, остальные вызовы с тем же
+    ключом, пришедшие пока запрос ещё выполняется, ждут и получают тот же
+    результат. После завершения запроса результат не сохраняется, поэтому
+    данные никогда не старше самого запроса (в отличие от TTL-кэша).
+    """
+
+    def __init__(self):
+        """Инициализация группы объединения запросов"""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._generation = 0
+        self.executed = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Выполнение функции с объединением одинаковых одновременных вызовов
+
+        Args:
+            key (Hashable): Ключ запроса (одинаковые ключи объединяются)
+            fn (Callable[[], Any]): Функция, выполняющая запрос
+
+        Returns:
+            Any: Результат функции (общий для всех объединённых вызовов)
+        """
+        with self._lock:
+            flight_key = (self._generation, key)
+            call = self._calls.get(flight_key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[flight_key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(flight_key) is call:
+                    del self._calls[flight_key]
+            call.done.set()
+
+    def invalidate(self):
+        """
+        Сброс выполняющихся запросов после записи.
+
+        Запросы, пришедшие после вызова, не присоединяются к чтениям,
+        начатым до записи, и выполняют новый запрос к базе данных.
+        """
+        with self._lock:
+            self._generation += 1
+            self._calls.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """
+        Получение счётчиков объединения запросов
+
+        Returns:
+            dict: Словарь со счётчиками
+        """
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "invalidations": self.invalidations,
+            }
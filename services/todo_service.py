@@ -1,28 +1,44 @@
 from typing import List, Optional
 from models.todo import Todo
-from repositories.todo_repository import TodoRepository
+from repositories.base import BaseTodoRepository
+from repositories.factory import create_todo_repository
+from services.single_flight import SingleFlight
 from sqlalchemy.orm import Session
 
+# Общая для всех экземпляров сервиса группа объединения одинаковых чтений
+read_flight = SingleFlight()
+
 
 class TodoService:
     """Сервис для работы с задачами"""
 
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Optional[Session] = None,
+        repository: Optional[BaseTodoRepository] = None,
+    ):
         """
         Инициализация сервиса
 
         Args:
-            db (Session): Сессия базы данных
+            db (Optional[Session]): Сессия базы данных
+            repository (Optional[BaseTodoRepository]): Репозиторий задач
+                (по умолчанию - хранилище, выбранное в Config)
         """
-        self.repository = TodoRepository(db)
+        self.repository = repository or create_todo_repository(db)
 
-    def create_todo(self, title: str, description: Optional[str] = None) -> Todo:
+    def create_todo(
+        self, title: str, description: Optional[str] = None, commit: bool = True
+    ) -> Todo:
         """
         Создание новой задачи
 
         Args:
             title (str): Заголовок задачи
             description (Optional[str]): Описание задачи
+            commit (bool): Зафиксировать транзакцию (False - фиксирует
+                вызывающий код вместе со своими изменениями и затем
+                вызывает invalidate_reads)
 
         Returns:
             Todo: Созданная задача
@@ -39,7 +55,16 @@ class TodoService:
 
         # Создание задачи
         todo = Todo(title=title.strip(), description=description)
-        return self.repository.create(todo)
+        created = self.repository.create(todo, commit=commit)
+        # До фиксации задачу не видно другим сессиям: чтение, начатое после
+        # сброса, закешировало бы результат без неё
+        if commit:
+            self.invalidate_reads()
+        return created
+
+    def invalidate_reads(self):
+        """Сброс объединяемых чтений после фиксации изменений задач"""
+        read_flight.invalidate()
 
     def get_todo(self, todo_id: int) -> Optional[Todo]:
         """
@@ -51,10 +76,16 @@ class TodoService:
         Returns:
             Optional[Todo]: Задача или None, если не найдена
         """
-        return self.repository.get_by_id(todo_id)
+        return read_flight.do(
+            ("get_todo", todo_id), lambda: self.repository.get_by_id(todo_id)
+        )
 
     def get_all_todos(
-        self, completed: Optional[bool] = None, skip: int = 0, limit: int = 100
+        self,
+        completed: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
     ) -> List[Todo]:
         """
         Получение всех задач
@@ -63,13 +94,22 @@ class TodoService:
             completed (Optional[bool]): Фильтр по статусу выполнения
             skip (int): Количество пропускаемых записей
             limit (int): Максимальное количество записей
+            include_archived (bool): Включать ли архивные задачи
 
         Returns:
             List[Todo]: Список задач
         """
         if completed is not None:
-            return self.repository.get_by_status(completed, skip, limit)
-        return self.repository.get_all(skip, limit)
+            return read_flight.do(
+                ("get_by_status", completed, skip, limit, include_archived),
+                lambda: self.repository.get_by_status(
+                    completed, skip, limit, include_archived
+                ),
+            )
+        return read_flight.do(
+            ("get_all", skip, limit, include_archived),
+            lambda: self.repository.get_all(skip, limit, include_archived),
+        )
 
     def update_todo(
         self,
@@ -107,7 +147,9 @@ class TodoService:
         if description is not None and len(description) > 1000:
             raise ValueError("Описание задачи не может превышать 1000 символов")
 
-        return self.repository.update(todo_id, title, description, completed)
+        updated = self.repository.update(todo_id, title, description, completed)
+        read_flight.invalidate()
+        return updated
 
     def delete_todo(self, todo_id: int) -> bool:
         """
@@ -119,7 +161,9 @@ class TodoService:
         Returns:
             bool: True, если задача была удалена, False если не найдена
         """
-        return self.repository.delete(todo_id)
+        deleted = self.repository.delete(todo_id)
+        read_flight.invalidate()
+        return deleted
 
     def toggle_todo_status(self, todo_id: int) -> Optional[Todo]:
         """
@@ -143,6 +187,15 @@ class TodoService:
         """
         Получение статистики по задачам
 
+        Returns:
+            dict: Словарь со статистикой
+        """
+        return read_flight.do(("get_stats",), self._load_stats)
+
+    def _load_stats(self) -> dict:
+        """
+        Подсчёт статистики по задачам в базе данных
+
         Returns:
             dict: Словарь со статистикой
         """
@@ -0,0 +1,88 @@
+"""
+Вызов ASGI-приложения внутри процесса для тестов и benchmarks/soak.py.
+"""
+
+import json
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class Response:
+    """Ответ ASGI-приложения"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+async def request(
+    app,
+    method: str,
+    path: str,
+    body=None,
+    headers: Iterable[Tuple[str, str]] = (),
+    query: str = "",
+) -> Response:
+    """
+    Вызов ASGI-приложения внутри процесса (без сети)
+
+    Args:
+        app: ASGI-приложение
+        method (str): HTTP-метод
+        path (str): Путь запроса
+        body: Тело запроса (сериализуется в JSON)
+        headers (Iterable[Tuple[str, str]]): Дополнительные заголовки
+        query (str): Строка запроса
+
+    Returns:
+        Response: Код, заголовки и тело ответа
+    """
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    raw_headers = [
+        (b"host", b"test"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(payload)).encode("latin-1")),
+    ] + [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in headers
+    ]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("latin-1"),
+        "query_string": query.encode("latin-1"),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("test", 80),
+    }
+    sent = False
+    status: Optional[int] = None
+    response_headers: Dict[str, str] = {}
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for name, value in message.get("headers", []):
+                response_headers[name.decode("latin-1")] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return Response(status, response_headers, b"".join(chunks))
@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Окружение задаётся до импорта приложения: движок базы данных создаётся
+# при импорте database.db по Config.DATABASE_URL
+_tmp_dir = tempfile.mkdtemp(prefix="todo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'test.db')}"
+os.environ["APP_ENV"] = "test"
+os.environ["APP_SQL_ECHO"] = "0"
+os.environ["APP_REPOSITORY"] = "sqlite"
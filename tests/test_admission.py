@@ -0,0 +1,84 @@
+"""
+Перегрузочный тест контроля допуска.
+
+Шторм записей идёт в обработчики, выполняемые в пуле потоков (как
+синхронные обработчики API задач). Проверяется, что допущенные записи
+ждут в очереди не дольше дедлайна, отказы приходят с 503 и Retry-After,
+а чтения и /health не отклоняются.
+"""
+
+import asyncio
+import time
+from fastapi import FastAPI
+from middleware.admission import AdmissionMiddleware
+from tests.asgi import request
+
+SERVICE_TIME = 0.05
+DEADLINE = 0.3
+LIMITS = {
+    "read": {"max_concurrency": 16, "max_queue": 256, "deadline": 2.0},
+    "write": {"max_concurrency": 2, "max_queue": 8, "deadline": DEADLINE},
+}
+
+
+def make_app():
+    inner = FastAPI()
+
+    @inner.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    @inner.get("/api/v1/todos/")
+    def list_todos():
+        return {"status": "success", "data": []}
+
+    @inner.post("/api/v1/todos/", status_code=201)
+    def create_todo(todo_data: dict):
+        # Синхронный обработчик: выполняется в пуле потоков и держит слот
+        time.sleep(SERVICE_TIME)
+        return {"status": "success", "data": todo_data}
+
+    return AdmissionMiddleware(inner, limits=LIMITS, exempt_paths=("/health",))
+
+
+async def timed(app, method, path, body=None):
+    started = time.monotonic()
+    response = await request(app, method, path, body=body)
+    return response, time.monotonic() - started
+
+
+def p99(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+
+async def overload(app):
+    writes = [
+        timed(app, "POST", "/api/v1/todos/", {"title": f"t{i}"}) for i in range(200)
+    ]
+    reads = [timed(app, "GET", "/api/v1/todos/") for _ in range(100)]
+    health = [timed(app, "GET", "/health") for _ in range(50)]
+    results = await asyncio.gather(*writes, *reads, *health)
+    return results[:200], results[200:300], results[300:]
+
+
+def test_write_storm_is_bounded_and_shed_with_retry_after():
+    app = make_app()
+
+    writes, reads, health = asyncio.run(overload(app))
+
+    admitted = [latency for response, latency in writes if response.status == 201]
+    rejected = [response for response, _ in writes if response.status == 503]
+    assert len(admitted) + len(rejected) == len(writes)
+    assert admitted and rejected
+
+    # Допущенный запрос ждёт в очереди не дольше дедлайна и затем выполняется
+    assert app.pools["write"].max_queue_time <= DEADLINE
+    assert p99(admitted) <= DEADLINE + SERVICE_TIME * 2
+
+    for response in rejected:
+        assert int(response.headers["retry-after"]) >= 1
+
+    assert all(response.status == 200 for response, _ in reads)
+    assert all(response.status == 200 for response, _ in health)
+    assert app.pools["read"].rejected == 0
@@ -0,0 +1,45 @@
+"""
+Тесты архивации задач в хранилище SQLite при одновременных изменениях.
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from migrations.runner import MigrationRunner
+from models.todo import Todo
+from repositories.todo_repository import TodoRepository
+
+
+def test_todo_reopened_during_archiving_stays_active(tmp_path):
+    path = tmp_path / "todos.db"
+    engine = create_engine(f"sqlite:///{path}")
+    MigrationRunner(engine=engine, pause=0).upgrade()
+    db = sessionmaker(bind=engine)()
+    repo = TodoRepository(db)
+    reopened, archived = (repo.create(Todo(title=t)).id for t in ("reopened", "done"))
+    repo.update(reopened, completed=True)
+    repo.update(archived, completed=True)
+
+    # Задачу снова открывают в другом соединении после чтения ID порции,
+    # но до переноса в архив
+    pending = [True]
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def reopen_before_insert(conn, cursor, statement, *args):
+        if pending and statement.startswith("INSERT INTO todos_archive"):
+            pending.clear()
+            other = sqlite3.connect(path)
+            other.execute("UPDATE todos SET completed = 0 WHERE id = ?", (reopened,))
+            other.commit()
+            other.close()
+
+    moved = repo.archive_completed_before(datetime.now() + timedelta(days=1), 10)
+
+    assert moved == 1
+    assert [todo.id for todo in repo.get_by_status(False)] == [reopened]
+    assert [todo.id for todo in repo.get_by_status(True, include_archived=True)] == [
+        archived
+    ]
+    db.close()
+    engine.dispose()
@@ -0,0 +1,188 @@
+"""
+Тесты выбора формата и сжатия ответа по заголовкам Accept и Accept-Encoding.
+"""
+
+import asyncio
+import gzip
+from datetime import datetime
+import pytest
+from starlette.requests import Request
+from api import formats
+from api.formats import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    TODO_FIELDS,
+    choose_encoding,
+    compressed_cache,
+    negotiate_media_type,
+)
+from config import Config
+from migrations.runner import MigrationRunner
+from tests.asgi import request
+
+PATH = "/api/v1/todos/"
+# Выборка по заголовку, созданному только этим модулем
+TITLE = "formats"
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    monkeypatch.setattr(formats, "brotli", object())
+
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(formats, "brotli", None)
+
+
+def make_request(accept):
+    headers = [(b"accept", accept.encode("latin-1"))] if accept is not None else []
+    return Request({"type": "http", "method": "GET", "headers": headers})
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("", None),
+        ("gzip", "gzip"),
+        ("gzip, br", "br"),
+        ("br;q=0, gzip", "gzip"),
+        ("br;q=0.5, gzip;q=0.8", "gzip"),
+        ("BR;Q=0.9, gzip;q=0.1", "br"),
+        ("*", "br"),
+        ("*;q=0.5, br;q=0", "gzip"),
+        ("gzip;q=0, br;q=0.000", None),
+        ("gzip; q=0.", None),
+        ("gzip;q=abc", None),
+        ("identity", None),
+    ],
+)
+def test_choose_encoding(with_brotli, header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_without_brotli(without_brotli):
+    assert choose_encoding("br, gzip;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+    assert choose_encoding("*") == "gzip"
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, JSON_MEDIA_TYPE),
+        ("*/*", JSON_MEDIA_TYPE),
+        ("application/json", JSON_MEDIA_TYPE),
+        ("application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/x-msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack;q=0", JSON_MEDIA_TYPE),
+        ("application/msgpack; q=0.0, */*", JSON_MEDIA_TYPE),
+        ("application/msgpack;q=0.5, application/json", JSON_MEDIA_TYPE),
+        ("application/json;q=0.5, application/msgpack", MSGPACK_MEDIA_TYPE),
+        ("application/msgpack, */*;q=0.1", MSGPACK_MEDIA_TYPE),
+    ],
+)
+def test_negotiate_media_type_from_accept(monkeypatch, accept, expected):
+    monkeypatch.setattr(formats, "msgpack", object())
+
+    assert negotiate_media_type(make_request(accept), None) == expected
+
+
+def test_explicit_format_overrides_accept(monkeypatch):
+    monkeypatch.setattr(formats, "msgpack", object())
+    request = make_request("application/msgpack")
+
+    assert negotiate_media_type(request, "json") == JSON_MEDIA_TYPE
+
+
+@pytest.fixture(scope="module")
+def app():
+    MigrationRunner(pause=0).upgrade()
+    from app import app
+
+    for i in range(20):
+        body = {"title": TITLE, "description": f"описание задачи {i} " * 4}
+        assert asyncio.run(request(app, "POST", PATH, body=body)).status == 201
+    return app
+
+
+def get_todos(app, query="", headers=()):
+    return asyncio.run(request(app, "GET", PATH, headers=headers, query=query))
+
+
+def own_rows(app, query="limit=1000"):
+    rows = get_todos(app, query).json()["data"]
+    return [row for row in rows if row["title"] == TITLE]
+
+
+def test_columnar_layout_matches_rows(app):
+    rows = get_todos(app, "limit=1000").json()
+
+    columnar = get_todos(app, "limit=1000&layout=columnar").json()
+
+    assert columnar["count"] == rows["count"]
+    assert set(columnar["data"]) == set(TODO_FIELDS)
+    for field in TODO_FIELDS:
+        assert columnar["data"][field] == [row[field] for row in rows["data"]]
+
+
+def test_epoch_timestamps(app):
+    rows = own_rows(app)
+
+    epoch = own_rows(app, "limit=1000&timestamps=epoch")
+
+    assert [row["id"] for row in epoch] == [row["id"] for row in rows]
+    for iso_row, epoch_row in zip(rows, epoch):
+        for field in ("created_at", "updated_at"):
+            expected = int(datetime.fromisoformat(iso_row[field]).timestamp())
+            assert epoch_row[field] == expected
+
+
+def test_msgpack_format(app):
+    msgpack = pytest.importorskip("msgpack")
+    expected = get_todos(app, "limit=1000").json()
+
+    by_query = get_todos(app, "limit=1000&format=msgpack")
+    by_accept = get_todos(app, "limit=1000", [("Accept", MSGPACK_MEDIA_TYPE)])
+
+    for response in (by_query, by_accept):
+        assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+        assert msgpack.unpackb(response.body, raw=False) == expected
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_large_response_is_compressed(app, encoding):
+    if encoding == "br":
+        brotli = pytest.importorskip("brotli")
+        decompress = brotli.decompress
+    else:
+        decompress = gzip.decompress
+    plain = get_todos(app, "limit=1000")
+    assert len(plain.body) >= Config.COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in plain.headers
+
+    response = get_todos(app, "limit=1000", [("Accept-Encoding", encoding)])
+
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert decompress(response.body) == plain.body
+
+
+def test_small_response_is_not_compressed(app):
+    response = get_todos(app, "limit=1", [("Accept-Encoding", "gzip, br")])
+
+    assert len(response.body) < Config.COMPRESSION_MIN_SIZE
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert response.json()["count"] == 1
+
+
+def test_repeated_response_is_served_from_compressed_cache(app):
+    headers = [("Accept-Encoding", "gzip")]
+    first = get_todos(app, "limit=1000&layout=columnar", headers)
+    hits = compressed_cache.stats()["hits"]
+
+    second = get_todos(app, "limit=1000&layout=columnar", headers)
+
+    assert compressed_cache.stats()["hits"] == hits + 1
+    assert second.body == first.body
@@ -0,0 +1,174 @@
+"""
+Тесты создания задач с заголовком Idempotency-Key через API.
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from config import Config
+from database.db import SessionLocal, TodoDB, engine
+from migrations.runner import MigrationRunner
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.memory_repository import InMemoryTodoRepository
+from services.idempotency_service import request_fingerprint
+from services.todo_service import read_flight
+from tests.asgi import request
+
+PATH = "/api/v1/todos/"
+
+
+@pytest.fixture(scope="module")
+def app():
+    MigrationRunner(pause=0).upgrade()
+    from app import app
+
+    return app
+
+
+def count_titled(title):
+    db = SessionLocal()
+    try:
+        return db.query(TodoDB).filter(TodoDB.title == title).count()
+    finally:
+        db.close()
+
+
+def post(app, body, key):
+    return request(app, "POST", PATH, body=body, headers=[("Idempotency-Key", key)])
+
+
+def test_retry_replays_stored_response(app):
+    body = {"title": "replay"}
+
+    first = asyncio.run(post(app, body, "replay-key"))
+    second = asyncio.run(post(app, body, "replay-key"))
+
+    assert first.status == second.status == 201
+    assert "idempotent-replayed" not in first.headers
+    assert second.headers["idempotent-replayed"] == "true"
+    assert second.json() == first.json()
+    assert count_titled("replay") == 1
+
+
+def test_replay_does_not_write(app, monkeypatch):
+    # Периодическая очистка истёкших записей в этом запросе не выполняется
+    monkeypatch.setattr(Config, "IDEMPOTENCY_PURGE_EVERY", 10**9)
+    body = {"title": "read only replay"}
+    asyncio.run(post(app, body, "read-only-key"))
+    writes = []
+
+    def record_write(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            writes.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record_write)
+    try:
+        response = asyncio.run(post(app, body, "read-only-key"))
+    finally:
+        event.remove(engine, "before_cursor_execute", record_write)
+
+    assert response.headers["idempotent-replayed"] == "true"
+    assert writes == []
+
+
+def test_key_reused_with_other_body_is_rejected(app):
+    asyncio.run(post(app, {"title": "mismatch"}, "mismatch-key"))
+
+    response = asyncio.run(post(app, {"title": "other"}, "mismatch-key"))
+
+    assert response.status == 422
+    assert count_titled("other") == 0
+
+
+def test_concurrent_requests_with_same_key_create_once(app):
+    body = {"title": "concurrent"}
+
+    async def storm():
+        return await asyncio.gather(
+            *(post(app, body, "concurrent-key") for _ in range(8))
+        )
+
+    responses = asyncio.run(storm())
+
+    assert [r.status for r in responses] == [201] * 8
+    assert len({r.json()["data"]["id"] for r in responses}) == 1
+    replayed = [r for r in responses if r.headers.get("idempotent-replayed")]
+    assert len(replayed) == 7
+    assert count_titled("concurrent") == 1
+
+
+def test_wait_for_running_request_is_bounded(app):
+    body = {"title": "in progress"}
+    # Резервирование другого, ещё выполняющегося запроса с тем же ключом
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        IdempotencyRepository(db).reserve(
+            "busy-key",
+            request_fingerprint("POST", PATH, body),
+            expires_at=now + timedelta(hours=1),
+            stale_before=now - timedelta(hours=1),
+        )
+    finally:
+        db.close()
+
+    started = time.monotonic()
+    response = asyncio.run(post(app, body, "busy-key"))
+    waited = time.monotonic() - started
+
+    assert response.status == 409
+    assert waited < Config.ADMISSION_LIMITS["write"]["deadline"] + 0.5
+    assert count_titled("in progress") == 0
+
+
+def test_reads_are_invalidated_after_commit(app, monkeypatch):
+    # Сброс чтений до фиксации позволил бы закешировать список без задачи
+    visible = []
+    monkeypatch.setattr(
+        read_flight, "invalidate", lambda: visible.append(count_titled("invalidate"))
+    )
+
+    response = asyncio.run(post(app, {"title": "invalidate"}, "invalidate-key"))
+
+    assert response.status == 201
+    assert visible == [1]
+
+
+def use_backend(backend, monkeypatch):
+    """Подключение хранилища к API и подсчёт задач в нём по заголовку"""
+    if backend == "sqlite":
+        return count_titled
+    from api.todo_api import todo_service
+
+    repository = InMemoryTodoRepository()
+    monkeypatch.setattr(todo_service, "repository", repository)
+    return lambda title: sum(
+        todo.title == title for todo in repository.get_all(0, 1000, True)
+    )
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "memory"])
+def test_failed_response_save_leaves_no_todo(app, backend, monkeypatch):
+    count_created = use_backend(backend, monkeypatch)
+    body = {"title": f"atomic {backend}"}
+    key = f"atomic-{backend}"
+    complete = IdempotencyRepository.complete
+    failures = [RuntimeError("сбой сохранения ответа")]
+
+    def failing_complete(self, *args):
+        if failures:
+            raise failures.pop()
+        complete(self, *args)
+
+    monkeypatch.setattr(IdempotencyRepository, "complete", failing_complete)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(post(app, body, key))
+    assert count_created(body["title"]) == 0
+
+    response = asyncio.run(post(app, body, key))
+
+    assert response.status == 201
+    assert count_created(body["title"]) == 1
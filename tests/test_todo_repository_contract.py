@@ -0,0 +1,263 @@
+"""
+Контрактные тесты репозиториев задач.
+
+Каждый тест выполняется для хранилища SQLite (TodoRepository) и хранилища
+в памяти (InMemoryTodoRepository): оба должны вести себя одинаково.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from migrations.runner import MigrationRunner
+from models.todo import Todo
+from repositories.memory_repository import InMemoryTodoRepository
+from repositories.todo_repository import TodoRepository
+
+
+class SqliteBackend:
+    """Хранилище SQLite во временном файле"""
+
+    def __init__(self, tmp_path):
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'todos.db'}")
+        MigrationRunner(engine=self.engine, pause=0).upgrade()
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.sessions = []
+        self.repository = self.reopen()
+
+    def reopen(self) -> TodoRepository:
+        """Новый репозиторий над теми же данными (новая сессия)"""
+        session = self.session_factory()
+        self.sessions.append(session)
+        self.repository = TodoRepository(session)
+        return self.repository
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
+        self.engine.dispose()
+
+
+class MemoryBackend:
+    """Хранилище в памяти со снимком во временном файле"""
+
+    def __init__(self, tmp_path):
+        self.snapshot_path = str(tmp_path / "snapshot.json")
+        self.repository = InMemoryTodoRepository(snapshot_path=self.snapshot_path)
+
+    def reopen(self) -> InMemoryTodoRepository:
+        """Сохранение снимка и загрузка нового репозитория из него"""
+        self.repository.snapshot()
+        self.repository = InMemoryTodoRepository(snapshot_path=self.snapshot_path)
+        return self.repository
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def backend(request, tmp_path):
+    backend = {"sqlite": SqliteBackend, "memory": MemoryBackend}[request.param](
+        tmp_path
+    )
+    yield backend
+    backend.close()
+
+
+@pytest.fixture
+def repo(backend):
+    return backend.repository
+
+
+def create(repo, *titles):
+    return [repo.create(Todo(title=title)).id for title in titles]
+
+
+def ids(todos):
+    return [todo.id for todo in todos]
+
+
+def archive_all(repo, batch_size=100):
+    return repo.archive_completed_before(datetime.now() + timedelta(days=1), batch_size)
+
+
+def test_create_and_get(repo):
+    created = repo.create(Todo(title="Купить молоко", description="2 литра"))
+
+    assert created.id is not None
+    assert created.completed is False
+    todo = repo.get_by_id(created.id)
+    assert (todo.id, todo.title, todo.description, todo.completed) == (
+        created.id,
+        "Купить молоко",
+        "2 литра",
+        False,
+    )
+    assert todo.created_at is not None
+    assert repo.get_by_id(created.id + 100) is None
+
+
+def test_update(repo):
+    (todo_id,) = create(repo, "a")
+
+    updated = repo.update(todo_id, title="b", completed=True)
+
+    assert (updated.title, updated.completed) == ("b", True)
+    assert repo.get_by_id(todo_id).completed is True
+    assert repo.update(todo_id + 100, title="x") is None
+
+
+def test_delete(repo):
+    first, second = create(repo, "a", "b")
+
+    assert repo.delete(first) is True
+    assert repo.get_by_id(first) is None
+    assert repo.delete(first) is False
+    assert ids(repo.get_all()) == [second]
+
+
+def test_ids_are_not_reused_after_delete(repo):
+    first, last = create(repo, "a", "b")
+    repo.delete(last)
+
+    (new,) = create(repo, "c")
+
+    assert new > last
+
+
+def test_get_all_pages_in_id_order(repo):
+    todo_ids = create(repo, "a", "b", "c", "d", "e")
+
+    assert ids(repo.get_all()) == todo_ids
+    assert ids(repo.get_all(skip=1, limit=2)) == todo_ids[1:3]
+    assert repo.get_all(skip=10) == []
+
+
+def test_get_by_status(repo):
+    todo_ids = create(repo, "a", "b", "c", "d")
+    repo.update(todo_ids[3], completed=True)
+    repo.update(todo_ids[1], completed=True)
+
+    assert ids(repo.get_by_status(True)) == [todo_ids[1], todo_ids[3]]
+    assert ids(repo.get_by_status(False)) == [todo_ids[0], todo_ids[2]]
+    assert ids(repo.get_by_status(True, skip=1, limit=1)) == [todo_ids[3]]
+
+
+def test_counts(repo):
+    todo_ids = create(repo, "a", "b", "c")
+    repo.update(todo_ids[0], completed=True)
+
+    assert repo.count() == 3
+    assert repo.count_by_status(True) == 1
+    assert repo.count_by_status(False) == 2
+
+
+def test_archive_moves_only_old_completed(repo):
+    todo_ids = create(repo, "a", "b", "c", "d")
+    for todo_id in (todo_ids[0], todo_ids[1], todo_ids[3]):
+        repo.update(todo_id, completed=True)
+
+    assert repo.archive_completed_before(datetime.now() - timedelta(days=1), 100) == 0
+    assert archive_all(repo) == 3
+
+    assert ids(repo.get_all()) == [todo_ids[2]]
+    assert ids(repo.get_by_status(True)) == []
+    assert ids(repo.get_all(include_archived=True)) == todo_ids
+    assert ids(repo.get_by_status(True, include_archived=True)) == [
+        todo_ids[0],
+        todo_ids[1],
+        todo_ids[3],
+    ]
+    assert ids(repo.get_by_status(False, include_archived=True)) == [todo_ids[2]]
+    assert ids(repo.get_all(skip=1, limit=2, include_archived=True)) == todo_ids[1:3]
+
+
+def test_archive_respects_batch_size(repo):
+    todo_ids = create(repo, "a", "b", "c")
+    for todo_id in todo_ids:
+        repo.update(todo_id, completed=True)
+
+    assert archive_all(repo, batch_size=2) == 2
+    assert archive_all(repo, batch_size=2) == 1
+    assert archive_all(repo, batch_size=2) == 0
+
+
+def test_counts_include_archived(repo):
+    todo_ids = create(repo, "a", "b", "c")
+    repo.update(todo_ids[0], completed=True)
+    archive_all(repo)
+
+    assert repo.count() == 3
+    assert repo.count_by_status(True) == 1
+    assert repo.count_by_status(False) == 2
+
+
+def test_archived_todo_is_reachable_by_id(repo):
+    todo_ids = create(repo, "a", "b")
+    repo.update(todo_ids[0], completed=True)
+    archive_all(repo)
+
+    todo = repo.get_by_id(todo_ids[0])
+
+    assert (todo.id, todo.title, todo.completed) == (todo_ids[0], "a", True)
+
+
+def test_update_restores_archived(repo):
+    todo_ids = create(repo, "a", "b")
+    repo.update(todo_ids[0], completed=True)
+    archive_all(repo)
+
+    updated = repo.update(todo_ids[0], completed=False)
+
+    assert updated.completed is False
+    assert ids(repo.get_all()) == todo_ids
+    assert ids(repo.get_by_status(True, include_archived=True)) == []
+
+
+def test_delete_archived(repo):
+    todo_ids = create(repo, "a", "b")
+    repo.update(todo_ids[0], completed=True)
+    archive_all(repo)
+
+    assert repo.delete(todo_ids[0]) is True
+    assert repo.get_by_id(todo_ids[0]) is None
+    assert ids(repo.get_all(include_archived=True)) == [todo_ids[1]]
+    assert repo.count() == 1
+
+
+def test_ids_are_not_reused_after_archiving(repo):
+    todo_ids = create(repo, "t0", "t1", "t2")
+    repo.update(todo_ids[0], completed=True)
+    repo.update(todo_ids[1], completed=True)
+    archive_all(repo)
+    repo.delete(todo_ids[2])
+
+    (new,) = create(repo, "new")
+
+    assert new not in todo_ids
+    assert ids(repo.get_all(include_archived=True)) == todo_ids[:2] + [new]
+    assert repo.get_by_id(todo_ids[0]).title == "t0"
+
+
+def test_reopen_keeps_data(backend):
+    repo = backend.repository
+    todo_ids = create(repo, "a", "b", "c")
+    repo.update(todo_ids[0], completed=True)
+    repo.update(todo_ids[2], title="c2")
+    archive_all(repo)
+
+    reopened = backend.reopen()
+
+    assert [
+        (todo.id, todo.title, todo.completed)
+        for todo in reopened.get_all(include_archived=True)
+    ] == [
+        (todo_ids[0], "a", True),
+        (todo_ids[1], "b", False),
+        (todo_ids[2], "c2", False),
+    ]
+    assert ids(reopened.get_all()) == todo_ids[1:]
+    assert reopened.count() == 3
+    assert reopened.count_by_status(True) == 1
+    (new,) = create(reopened, "d")
+    assert new > todo_ids[2]